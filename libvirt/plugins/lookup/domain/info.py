@@ -44,6 +44,26 @@ DOCUMENTATION = r"""
             type: str
             required: false
             no_log: true
+        fields:
+            description:
+                - Keys to include in each returned domain dictionary
+                - When none of C(memory_info), C(disks) or C(interfaces) is requested,
+                  the domain XML is not fetched at all, which is much cheaper for wildcard lookups
+                - All keys are returned when omitted
+            type: list
+            elements: str
+            required: false
+        state_filter:
+            description:
+                - Only return domains in one of these states for wildcard terms
+                - The filter is evaluated by libvirtd, so non-matching domains are never transferred
+                - Values from the same group (active/inactive, persistent/transient,
+                  running/paused/shutoff) are combined with OR, groups with AND
+                - Has no effect on single domain lookups
+            type: list
+            elements: str
+            choices: ['active', 'inactive', 'persistent', 'transient', 'running', 'paused', 'shutoff']
+            required: false
     notes:
         - Requires libvirt-python to be installed on the control node
         - Returns empty dict/list when domain not found
@@ -68,6 +88,16 @@ EXAMPLES = r"""
   debug:
     msg: "{{ lookup('domain.info', '*') }}"
 
+# Get only the state of all domains, skipping the XML parsing
+- name: Get domain states
+  debug:
+    msg: "{{ lookup('domain.info', '*', fields=['name', 'state', 'id']) }}"
+
+# Get info for all running domains
+- name: Get running domains
+  debug:
+    msg: "{{ lookup('domain.info', '*', state_filter=['running']) }}"
+
 # Get info for domain on remote host
 - name: Get domain info from remote host
   debug:
@@ -134,17 +164,51 @@ try:
 except ImportError:
     HAS_LIBVIRT = False
 
+from concurrent.futures import ThreadPoolExecutor
+
 from ansible.errors import AnsibleError
 from ansible.plugins.lookup import LookupBase
 from ansible.utils.display import Display
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.libvirt_connection import LibvirtConnection
 from ansible_collections.nsys.libvirt.plugins.module_utils.domain.domain_utils import DomainUtils
 
 display = Display()
 
+# Upper bound for terms looked up concurrently
+MAX_WORKERS = 8
+
+if HAS_LIBVIRT:
+    # state_filter choices mapped to server-side getAllDomainStats filters
+    STATE_FILTER_FLAGS = {
+        'active': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_ACTIVE,
+        'inactive': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_INACTIVE,
+        'persistent': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_PERSISTENT,
+        'transient': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_TRANSIENT,
+        'running': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_RUNNING,
+        'paused': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_PAUSED,
+        'shutoff': libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_SHUTOFF,
+    }
+
 
 class LookupModule(LookupBase):
 
+    def lookup_term(self, domain_utils, term, pattern=None, fields=None, flags=0):
+        """Return the list of entries a single term contributes to the result"""
+        if pattern is not None:
+            domains = domain_utils.get_domains_by_regex(pattern, fields, flags)
+            if not domains:
+                display.vvv(f"No domains matched pattern: {term}")
+                return [[]]
+            return domains
+
+        # Single domain lookup: one lookupByName RPC, no listing involved
+        domain = domain_utils.try_lookup(term)
+        if domain is None:
+            display.vvv(f"Domain not found: {term}")
+            return [{}]
+        return [domain_utils.build_domain_info(domain, fields=fields)]
+
     def run(self, terms, variables=None, **kwargs):
         if not HAS_LIBVIRT:
             raise AnsibleError("libvirt-python is required for domain_info lookup")
@@ -153,14 +217,16 @@ class LookupModule(LookupBase):
         self.set_options(var_options=variables, direct=kwargs)
 
         # Initialize connection handler
-        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None))
+        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None),
+                                         cached=True)
 
         # Setup connection parameters
         libvirt_conn.setup_connection_params(
             uri=self.get_option('uri'),
             auth_user=self.get_option('auth_user'),
             auth_password=self.get_option('auth_password'),
-            remote_host=self.get_option('remote_host')
+            remote_host=self.get_option('remote_host'),
+            readonly=True
         )
 
         ret = []
@@ -175,26 +241,34 @@ class LookupModule(LookupBase):
                 # Initialize domain utilities
                 domain_utils = DomainUtils(conn)
 
+                fields = self.get_option('fields')
+
+                flags = 0
+                for state in self.get_option('state_filter') or []:
+                    flags |= STATE_FILTER_FLAGS[state]
+
+                # Query each distinct term once, results are mapped back in term order below
+                unique_terms = list(dict.fromkeys(terms))
+
+                # Translate each wildcard term to a regex once, not once per domain name
+                patterns = [compile_glob_union(term) if is_glob(term) else None for term in unique_terms]
+
+                # Terms are independent; run their RPCs side by side on the shared connection
+                with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(unique_terms)))) as executor:
+                    results = dict(zip(unique_terms, executor.map(
+                        lambda args: self.lookup_term(domain_utils, *args, fields=fields, flags=flags),
+                        zip(unique_terms, patterns))))
+
                 for term in terms:
-                    if '*' in term:
-                        domains = domain_utils.get_domains_by_pattern(term)
-                        if not domains:
-                            display.vvv(f"No domains matched pattern: {term}")
-                            ret.append([])
-                        else:
-                            ret.extend(domains)
-                    else:
-                        # Single domain lookup
-                        dom_info = domain_utils.get_domain_info(term)
-                        if not dom_info:
-                            display.vvv(f"Domain not found: {term}")
-                        ret.append(dom_info)
+                    ret.extend(results[term])
 
             finally:
                 libvirt_conn.close()
 
-            display.vvv(f"Domain info lookup result: {ret}")
+            # Formatting the whole result is costly for large wildcard matches
+            if display.verbosity >= 3:
+                display.vvv(f"Domain info lookup result: {ret}")
             return ret
 
-        except Exception as e:
+        except libvirt.libvirtError as e:
             raise AnsibleError(f"Error in domain_info lookup: {str(e)}")
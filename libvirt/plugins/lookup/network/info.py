@@ -128,6 +128,7 @@ except ImportError:
 from ansible.errors import AnsibleError
 from ansible.plugins.lookup import LookupBase
 from ansible.utils.display import Display
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.libvirt_connection import LibvirtConnection
 from ansible_collections.nsys.libvirt.plugins.module_utils.network.network_utils import NetworkUtils
 
@@ -144,14 +145,16 @@ class LookupModule(LookupBase):
         self.set_options(var_options=variables, direct=kwargs)
 
         # Initialize connection handler
-        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None))
+        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None),
+                                         cached=True)
 
         # Setup connection parameters
         libvirt_conn.setup_connection_params(
             uri=self.get_option('uri'),
             auth_user=self.get_option('auth_user'),
             auth_password=self.get_option('auth_password'),
-            remote_host=self.get_option('remote_host')
+            remote_host=self.get_option('remote_host'),
+            readonly=True
         )
 
         # Establish connection
@@ -163,18 +166,30 @@ class LookupModule(LookupBase):
             network_utils = NetworkUtils(conn)
             ret = []
 
-            for term in terms:
-                networks = network_utils.get_networks_by_pattern(term)
+            # Query each distinct term once, results are mapped back in term order below
+            results = {}
+            for term in dict.fromkeys(terms):
+                if is_glob(term):
+                    # Translate the glob once; matching then runs against the compiled regex
+                    networks = network_utils.get_networks_by_regex(compile_glob_union(term))
+                else:
+                    # Exact name: a single lookup RPC instead of listing every network
+                    net_info = network_utils.get_network_info(term)
+                    networks = [net_info] if net_info else []
 
                 if not networks and self.get_option('fail_on_missing'):
                     raise AnsibleError(f"No networks found matching pattern: {term}")
 
-                ret.extend(networks)
+                results[term] = networks
+
+            for term in terms:
+                ret.extend(results[term])
 
-            display.vvv(f"Network info lookup result: {ret}")
+            if display.verbosity >= 3:
+                display.vvv(f"Network info lookup result: {ret}")
             return ret
 
-        except Exception as e:
+        except libvirt.libvirtError as e:
             raise AnsibleError(f"Error in network_info lookup: {str(e)}")
         finally:
             libvirt_conn.close()
\ No newline at end of file
@@ -123,6 +123,14 @@ display = Display()
 
 class LookupModule(LookupBase):
 
+    def lookup_cidr(self, network_utils, cidr):
+        """Return network info for a CIDR, or an empty dict if none matches"""
+        network = network_utils.get_network_by_cidr(cidr)
+        if not network:
+            display.vvv(f"No network found with CIDR: {cidr}")
+            return {}
+        return network
+
     def run(self, terms, variables=None, **kwargs):
         if not HAS_LIBVIRT:
             raise AnsibleError("libvirt-python is required for network_info_by_ip lookup")
@@ -131,14 +139,16 @@ class LookupModule(LookupBase):
         self.set_options(var_options=variables, direct=kwargs)
 
         # Initialize connection handler
-        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None))
+        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None),
+                                         cached=True)
 
         # Setup connection parameters
         libvirt_conn.setup_connection_params(
             uri=self.get_option('uri'),
             auth_user=self.get_option('auth_user'),
             auth_password=self.get_option('auth_password'),
-            remote_host=self.get_option('remote_host')
+            remote_host=self.get_option('remote_host'),
+            readonly=True
         )
 
         ret = []
@@ -151,18 +161,17 @@ class LookupModule(LookupBase):
         try:
             network_utils = NetworkUtils(conn)
 
-            for term in terms:
-                network = network_utils.get_network_by_cidr(term)
-                if network:
-                    ret.append(network)
-                else:
-                    display.vvv(f"No network found with CIDR: {term}")
-                    ret.append({})
+            # Resolve each distinct CIDR once; the networks are only listed for the first
+            # term, later terms are answered from NetworkUtils' CIDR index
+            results = {term: self.lookup_cidr(network_utils, term) for term in dict.fromkeys(terms)}
+
+            ret.extend(results[term] for term in terms)
 
-            display.vvv(f"Network info by IP lookup result: {ret}")
+            if display.verbosity >= 3:
+                display.vvv(f"Network info by IP lookup result: {ret}")
             return ret
 
-        except Exception as e:
+        except libvirt.libvirtError as e:
             raise AnsibleError(f"Error in network_info_by_ip lookup: {str(e)}")
         finally:
             libvirt_conn.close()
\ No newline at end of file
@@ -68,7 +68,8 @@ _raw:
     elements: str
 """
 
-import xml.etree.ElementTree as ET
+import re
+from concurrent.futures import ThreadPoolExecutor
 from ansible.errors import AnsibleError
 from ansible.plugins.lookup import LookupBase
 from ansible.utils.display import Display
@@ -80,48 +81,118 @@ try:
 except ImportError:
     HAS_LIBVIRT = False
 
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+
 display = Display()
 
+# Upper bound for domain/network pairs resolved concurrently
+MAX_WORKERS = 8
+
+if HAS_LXML:
+    # Compiled once; names are bound as XPath variables, so no quoting is needed
+    MAC_XPATH = ET.XPath("//interface[source/@network=$network]/mac/@address")
+
+# Network XML is flat and machine-written: scanning the <host .../> tags is
+# enough to read a DHCP reservation without building a tree for every host
+HOST_TAG_RE = re.compile(r"<host\s([^>]*)>")
+ATTRIBUTE_RE = re.compile(r"([\w-]+)=(['\"])(.*?)\2")
+
+
+def quote_predicate_value(value):
+    """Quote a value for use in an ElementPath attribute predicate"""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    raise AnsibleError(f"Value {value} cannot contain both quote characters")
+
+
 class LookupModule(LookupBase):
 
-    def get_vm_mac_address(self, domain, network_name):
-        """Get MAC address of domain's interface in specified network"""
+    def get_vm_mac_address(self, domain, network_name, xml_cache=None):
+        """Get MAC address of domain's interface in specified network
+
+        Returns a (mac, root) tuple; root is the parsed domain XML so callers can
+        read further details without parsing again. xml_cache optionally maps
+        domain UUIDs to parsed roots so a domain queried for several networks is
+        only fetched and parsed once.
+        """
         try:
-            # Get domain XML and parse it
-            domain_xml = domain.XMLDesc()
-            root = ET.fromstring(domain_xml)
-
-            # Find interface connected to specified network
-            for interface in root.findall(".//interface"):
-                source = interface.find("source")
-                if source is not None and source.get("network") == network_name:
-                    mac = interface.find("mac")
-                    if mac is not None:
-                        return mac.get("address")
-            return None
+            uuid = domain.UUIDString()
+            root = xml_cache.get(uuid) if xml_cache is not None else None
+            if root is None:
+                # The persistent definition is enough to find the MAC and omits runtime state
+                domain_xml = domain.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE)
+                root = ET.fromstring(domain_xml)
+                if xml_cache is not None:
+                    xml_cache[uuid] = root
+
+            # Find MAC of the interface connected to specified network
+            if HAS_LXML:
+                addresses = MAC_XPATH(root, network=network_name)
+                return (str(addresses[0]) if addresses else None), root
+            mac = root.find(
+                f".//interface/source[@network={quote_predicate_value(network_name)}]/../mac")
+            return (mac.get("address") if mac is not None else None), root
 
         except libvirt.libvirtError as e:
             raise AnsibleError(f"Error getting domain XML: {str(e)}")
         except ET.ParseError:
             raise AnsibleError("Failed to parse domain XML")
 
-    def get_reserved_ip(self, network, mac_address):
-        """Get reserved IP address for MAC address in network"""
+    def get_dhcp_reservations(self, network):
+        """Get the MAC to reserved IP mapping of a network's DHCP host entries"""
         try:
-            # Get network XML and parse it
             network_xml = network.XMLDesc()
-            root = ET.fromstring(network_xml)
+        except libvirt.libvirtError as e:
+            raise AnsibleError(f"Error getting network XML: {str(e)}")
+
+        # DNS <host> entries carry no mac and are skipped
+        reservations = {}
+        for match in HOST_TAG_RE.finditer(network_xml):
+            attributes = {name: value for name, _quote, value in ATTRIBUTE_RE.findall(match.group(1))}
+            if "mac" in attributes:
+                reservations.setdefault(attributes["mac"], attributes.get("ip"))
+        return reservations
+
+    def load_reservations(self, conn, network_name):
+        """Get the DHCP reservations of a network by name, None if the network is not found"""
+        try:
+            network = conn.networkLookupByName(network_name)
+        except libvirt.libvirtError as e:
+            display.vvv(f"Error looking up network {network_name}: {str(e)}")
+            return None
+        return self.get_dhcp_reservations(network)
+
+    def resolve_reserved_ip(self, conn, domain_name, network_name, reservations, domain_xml_cache=None):
+        """Get reserved IP for a domain/network pair, None if not resolvable
 
-            # Look for DHCP host entries with matching MAC
-            for host in root.findall(".//dhcp/host"):
-                if host.get("mac") == mac_address:
-                    return host.get("ip")
+        reservations is the MAC to IP mapping of the network, as returned by
+        load_reservations(); None means the network could not be found.
+        """
+        if reservations is None:
             return None
 
+        try:
+            domain = conn.lookupByName(domain_name)
+
+            # Get MAC address for domain's interface in this network
+            mac_address, _root = self.get_vm_mac_address(domain, network_name, domain_xml_cache)
+            if not mac_address:
+                display.vvv(f"No interface found for network {network_name} in domain {domain_name}")
+                return None
+
+            # Get reserved IP for this MAC
+            return reservations.get(mac_address)
+
         except libvirt.libvirtError as e:
-            raise AnsibleError(f"Error getting network XML: {str(e)}")
-        except ET.ParseError:
-            raise AnsibleError("Failed to parse network XML")
+            display.vvv(f"Error looking up domain: {str(e)}")
+            return None
 
     def run(self, terms, variables=None, **kwargs):
         if not HAS_LIBVIRT:
@@ -133,19 +204,28 @@ class LookupModule(LookupBase):
         # Process options
         self.set_options(var_options=variables, direct=kwargs)
 
+        # Parse domain/network names before touching libvirt
+        pairs = []
+        for term in terms:
+            try:
+                domain_name, network_name = term.split('/')
+            except ValueError:
+                raise AnsibleError(f"Invalid format for {term}. Use 'domain_name/network_name'")
+            pairs.append((domain_name, network_name))
+
         # Initialize connection handler
-        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None))
+        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None),
+                                         cached=True)
 
         # Setup connection parameters
         libvirt_conn.setup_connection_params(
             uri=self.get_option('uri'),
             auth_user=self.get_option('auth_user'),
             auth_password=self.get_option('auth_password'),
-            remote_host=self.get_option('remote_host')
+            remote_host=self.get_option('remote_host'),
+            readonly=True
         )
 
-        ret = []
-
         try:
             # Establish connection
             success, conn = libvirt_conn.connect()
@@ -153,37 +233,28 @@ class LookupModule(LookupBase):
                 raise AnsibleError(f"Failed to connect to libvirt: {conn}")
 
             try:
-                for term in terms:
-                    # Parse domain/network names
-                    try:
-                        domain_name, network_name = term.split('/')
-                    except ValueError:
-                        raise AnsibleError(f"Invalid format for {term}. Use 'domain_name/network_name'")
-
-                    try:
-                        # Look up domain and network
-                        domain = conn.lookupByName(domain_name)
-                        network = conn.networkLookupByName(network_name)
-
-                        # Get MAC address for domain's interface in this network
-                        mac_address = self.get_vm_mac_address(domain, network_name)
-                        if not mac_address:
-                            display.vvv(f"No interface found for network {network_name} in domain {domain_name}")
-                            ret.append(None)
-                            continue
-
-                        # Get reserved IP for this MAC
-                        ip_address = self.get_reserved_ip(network, mac_address)
-                        ret.append(ip_address)
-
-                    except libvirt.libvirtError as e:
-                        display.vvv(f"Error looking up domain or network: {str(e)}")
-                        ret.append(None)
+                # The connection is thread-safe, so overlap the RPCs of each distinct
+                # pair; results are mapped back in term order
+                unique_pairs = list(dict.fromkeys(pairs))
+                network_names = list(dict.fromkeys(network_name for _domain, network_name in unique_pairs))
+
+                # Per-call cache of domain XML, keyed by UUID
+                domain_xml_cache = {}
+                with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(unique_pairs)))) as executor:
+                    # Each network's XML is fetched and scanned once, whatever the number of domains
+                    reservations = dict(zip(network_names, executor.map(
+                        lambda network_name: self.load_reservations(conn, network_name), network_names)))
+
+                    results = dict(zip(unique_pairs, executor.map(
+                        lambda pair: self.resolve_reserved_ip(conn, *pair, reservations[pair[1]], domain_xml_cache),
+                        unique_pairs)))
+
+                ret = [results[pair] for pair in pairs]
 
             finally:
                 libvirt_conn.close()
 
             return ret
 
-        except Exception as e:
+        except libvirt.libvirtError as e:
             raise AnsibleError(f"Error in reserved_ip lookup: {str(e)}")
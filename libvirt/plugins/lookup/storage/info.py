@@ -112,6 +112,8 @@ try:
 except ImportError:
     HAS_LIBVIRT = False
 
+from itertools import chain
+
 from ansible.errors import AnsibleError
 from ansible.plugins.lookup import LookupBase
 from ansible.utils.display import Display
@@ -123,6 +125,34 @@ display = Display()
 
 class LookupModule(LookupBase):
 
+    def lookup_term(self, volume_utils, term):
+        """Return the entries a single term contributes to the result (may be lazy)"""
+        try:
+            # Parse the pool/volume path
+            pool_name, volume_pattern = volume_utils.parse_volume_path(term)
+        except ValueError as e:
+            raise AnsibleError(str(e))
+
+        # Handle wildcard patterns
+        if '*' in volume_pattern:
+            # Refresh pool to ensure we have current volume list
+            if not volume_utils.refresh_pool(pool_name):
+                display.warning(f"Failed to refresh pool: {pool_name}")
+                return [[]]
+
+            volumes = volume_utils.iter_volumes_by_pattern(pool_name, volume_pattern)
+            first = next(volumes, None)
+            if first is None:
+                display.vvv(f"No volumes matched pattern: {volume_pattern}")
+                return [[]]
+            return chain((first,), volumes)
+
+        # Single volume lookup
+        vol_info = volume_utils.get_volume_info(pool_name, volume_pattern)
+        if not vol_info:
+            display.vvv(f"Volume not found: {term}")
+        return [vol_info]
+
     def run(self, terms, variables=None, **kwargs):
         if not HAS_LIBVIRT:
             raise AnsibleError("libvirt-python is required for volume_info lookup")
@@ -131,7 +161,8 @@ class LookupModule(LookupBase):
         self.set_options(var_options=variables, direct=kwargs)
 
         # Initialize connection handler
-        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None))
+        libvirt_conn = LibvirtConnection(self._templar.available_variables.get('ansible_module', None),
+                                         cached=True)
 
         # Setup connection parameters
         libvirt_conn.setup_connection_params(
@@ -153,39 +184,24 @@ class LookupModule(LookupBase):
                 # Initialize volume utilities
                 volume_utils = VolumeUtils(conn)
 
+                # Stream each distinct term's entries straight into the result;
+                # repeated terms copy the slice the first occurrence produced
+                spans = {}
                 for term in terms:
-                    try:
-                        # Parse the pool/volume path
-                        pool_name, volume_pattern = volume_utils.parse_volume_path(term)
-                    except ValueError as e:
-                        raise AnsibleError(str(e))
-
-                    # Handle wildcard patterns
-                    if '*' in volume_pattern:
-                        # Refresh pool to ensure we have current volume list
-                        if not volume_utils.refresh_pool(pool_name):
-                            display.warning(f"Failed to refresh pool: {pool_name}")
-                            ret.append([])
-                            continue
-
-                        volumes = volume_utils.get_volumes_by_pattern(pool_name, volume_pattern)
-                        if not volumes:
-                            display.vvv(f"No volumes matched pattern: {volume_pattern}")
-                            ret.append([])
-                        else:
-                            ret.extend(volumes)
-                    else:
-                        # Single volume lookup
-                        vol_info = volume_utils.get_volume_info(pool_name, volume_pattern)
-                        if not vol_info:
-                            display.vvv(f"Volume not found: {term}")
-                        ret.append(vol_info)
+                    if term in spans:
+                        start, end = spans[term]
+                        ret.extend(ret[start:end])
+                        continue
+                    start = len(ret)
+                    ret.extend(self.lookup_term(volume_utils, term))
+                    spans[term] = (start, len(ret))
 
             finally:
                 libvirt_conn.close()
 
-            display.vvv(f"Volume info lookup result: {ret}")
+            if display.verbosity >= 3:
+                display.vvv(f"Volume info lookup result: {ret}")
             return ret
 
-        except Exception as e:
+        except libvirt.libvirtError as e:
             raise AnsibleError(f"Error in volume_info lookup: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,107 @@
+# ./plugins/module_utils/common/glob_utils.py
+# nsys-ai-claude-3.5
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fnmatch
+import re
+from functools import lru_cache
+from typing import Pattern
+
+try:
+    import re2
+except ImportError:
+    HAS_RE2 = False
+else:
+    HAS_RE2 = True
+
+# Characters that give a name glob semantics in fnmatch
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_glob(pattern: str) -> bool:
+    """
+    Check whether a name contains glob metacharacters
+
+    Args:
+        pattern: Name or glob pattern
+
+    Returns:
+        bool: True if the pattern can match more than the literal name
+    """
+    return not GLOB_CHARS.isdisjoint(pattern)
+
+
+def _translate_re2(pattern: str) -> str:
+    """
+    Translate a glob pattern into a regex RE2 accepts
+
+    fnmatch.translate() emits atomic groups and \\Z, neither of which RE2
+    supports; RE2 matches in linear time and does not need them.
+
+    Args:
+        pattern: Glob pattern as understood by fnmatch
+
+    Returns:
+        str: Regular expression anchored at the end of the name
+    """
+    res = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == "*":
+            # Consecutive stars are equivalent to a single one
+            if not res or res[-1] != ".*":
+                res.append(".*")
+        elif c == "?":
+            res.append(".")
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                # Unterminated set matches a literal bracket
+                res.append("\\[")
+                continue
+            stuff = pattern[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if stuff.startswith("!"):
+                stuff = "^" + stuff[1:]
+            elif stuff.startswith("^"):
+                stuff = "\\" + stuff
+            res.append(f"[{stuff}]")
+        else:
+            res.append(re.escape(c))
+    return f"(?s:{''.join(res)})$"
+
+
+@lru_cache(maxsize=256)
+def compile_glob_union(*patterns: str) -> Pattern:
+    """
+    Compile glob patterns into a single regular expression
+
+    The result is cached, so translating the same patterns again is free.
+    When google-re2 is installed the union is compiled with RE2, which
+    matches in linear time; patterns RE2 rejects fall back to re.
+
+    Args:
+        *patterns: Glob patterns as understood by fnmatch
+
+    Returns:
+        Pattern: Compiled regex whose match() succeeds if any pattern matches
+    """
+    if not patterns:
+        # Nothing to match against
+        return re.compile(r"(?!)")
+    if HAS_RE2:
+        try:
+            return re2.compile("|".join(f"(?:{_translate_re2(pattern)})" for pattern in patterns))
+        except re2.error:
+            pass
+    return re.compile("|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns))
@@ -1,9 +1,10 @@
 # ./plugins/module_utils/common/libvirt_connection.py
 # nsys-ai-claude-3.5
 
+import atexit
 import libvirt
 from ansible.module_utils.basic import AnsibleModule
-from typing import Optional, Tuple, Union
+from typing import Dict, Optional, Tuple, Union
 
 EXAMPLES = r'''
 Using:
@@ -35,6 +36,31 @@ def main():
     )
 '''
 
+# Connections shared by LibvirtConnection instances created with cached=True,
+# keyed by (uri, auth user, readonly). They stay open until the interpreter exits.
+_CONN_CACHE: Dict[Tuple[str, Optional[str], bool], libvirt.virConnect] = {}
+
+
+def _close_cached_connections() -> None:
+    """Close all cached libvirt connections (registered with atexit)"""
+    while _CONN_CACHE:
+        _, conn = _CONN_CACHE.popitem()
+        try:
+            conn.close()
+        except libvirt.libvirtError:
+            pass
+
+
+atexit.register(_close_cached_connections)
+
+# Keepalive probe interval in seconds and unanswered probes before the
+# connection is considered dead, so a vanished peer fails calls within ~15s
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+
+# Credential types answered by LibvirtConnection._request_cred
+_AUTH_CRED_TYPES = [libvirt.VIR_CRED_AUTHNAME, libvirt.VIR_CRED_PASSPHRASE]
+
 
 class LibvirtConnection:
     """
@@ -42,23 +68,28 @@ class LibvirtConnection:
     Provides a reusable pattern for establishing and managing libvirt connections.
     """
 
-    def __init__(self, module: AnsibleModule):
+    def __init__(self, module: AnsibleModule, cached: bool = False):
         """
         Initialize the LibvirtConnection with an Ansible module instance
 
         Args:
             module: The AnsibleModule instance from the calling module
+            cached: Reuse a process-wide connection for the same URI and user
+                    instead of opening a new one; close() then leaves it open
         """
         self.module = module
+        self.cached = cached
         self.uri = None
         self.conn = None
         self.auth_params = {}
+        self.readonly = False
 
     def setup_connection_params(self,
                                 uri: Optional[str] = None,
                                 auth_user: Optional[str] = None,
                                 auth_password: Optional[str] = None,
-                                remote_host: Optional[str] = None) -> None:
+                                remote_host: Optional[str] = None,
+                                readonly: bool = False) -> None:
         """
         Setup the connection parameters for libvirt
 
@@ -67,7 +98,11 @@ class LibvirtConnection:
             auth_user: Username for authentication if required
             auth_password: Password for authentication if required
             remote_host: Remote host to connect to if using remote connection
+            readonly: Open a read-only connection (VIR_CONNECT_RO); enough for
+                      informational queries and usually not subject to polkit checks
         """
+        self.readonly = readonly
+
         if uri:
             self.uri = uri
         elif remote_host:
@@ -80,6 +115,24 @@ class LibvirtConnection:
         if auth_password:
             self.auth_params['password'] = auth_password
 
+    def _request_cred(self, credentials: list, user_data) -> int:
+        """
+        Fill in credentials requested by libvirt.openAuth()
+
+        Args:
+            credentials: Credential requests; index 0 is the type, index 4 receives the result
+            user_data: Opaque data from the auth descriptor (unused)
+
+        Returns:
+            int: 0 on success, as expected by libvirt
+        """
+        for credential in credentials:
+            if credential[0] == libvirt.VIR_CRED_AUTHNAME:
+                credential[4] = self.auth_params.get('username', '')
+            elif credential[0] == libvirt.VIR_CRED_PASSPHRASE:
+                credential[4] = self.auth_params.get('password', '')
+        return 0
+
     def connect(self) -> Tuple[bool, Union[libvirt.virConnect, str]]:
         """
         Establish connection to libvirt
@@ -89,26 +142,45 @@ class LibvirtConnection:
             - Boolean indicating success/failure
             - Either the libvirt connection object on success, or error message on failure
         """
+        cache_key = (self.uri, self.auth_params.get('username'), self.readonly)
+        if self.cached and cache_key in _CONN_CACHE:
+            cached_conn = _CONN_CACHE[cache_key]
+            try:
+                if cached_conn.isAlive():
+                    self.conn = cached_conn
+                    return True, self.conn
+            except libvirt.libvirtError:
+                pass
+            # Drop the dead handle and open a fresh connection below
+            del _CONN_CACHE[cache_key]
+            try:
+                cached_conn.close()
+            except libvirt.libvirtError:
+                pass
+
         try:
             if self.auth_params:
-
-                def request_cred(credentials, user_data):
-                    for credential in credentials:
-                        if credential[0] == libvirt.VIR_CRED_AUTHNAME:
-                            credential[4] = self.auth_params.get('username', '')
-                        elif credential[0] == libvirt.VIR_CRED_PASSPHRASE:
-                            credential[4] = self.auth_params.get('password', '')
-                    return 0
-
-                auth = [[libvirt.VIR_CRED_AUTHNAME, libvirt.VIR_CRED_PASSPHRASE],
-                        request_cred, None]
-                self.conn = libvirt.openAuth(self.uri, auth, 0)
+                auth = [_AUTH_CRED_TYPES, self._request_cred, None]
+                flags = libvirt.VIR_CONNECT_RO if self.readonly else 0
+                self.conn = libvirt.openAuth(self.uri, auth, flags)
+            elif self.readonly:
+                self.conn = libvirt.openReadOnly(self.uri)
             else:
                 self.conn = libvirt.open(self.uri)
 
             if not self.conn:
                 return False, f"Failed to connect to libvirt at {self.uri}"
 
+            try:
+                self.conn.setKeepAlive(KEEPALIVE_INTERVAL, KEEPALIVE_COUNT)
+            except libvirt.libvirtError:
+                # Keepalive needs a registered event loop (see domain_utils.start_event_loop);
+                # callers without one run without it
+                pass
+
+            if self.cached:
+                _CONN_CACHE[cache_key] = self.conn
+
             return True, self.conn
 
         except libvirt.libvirtError as e:
@@ -129,7 +201,10 @@ class LibvirtConnection:
         return self.conn
 
     def close(self) -> None:
-        """Close the libvirt connection if active"""
+        """Close the libvirt connection if active (cached connections are only released)"""
+        if self.cached:
+            self.conn = None
+            return
         if self.conn:
             try:
                 ret = self.conn.close()
@@ -4,10 +4,95 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import errno
 import os
 import pwd
 import grp
-from typing import Optional, Tuple, Union
+import stat
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# Opt-in: answer name lookups from one read of /etc/passwd and /etc/group
+# before asking NSS. Names missing there (LDAP, SSSD, ...) still go through
+# NSS, but a local entry wins over a directory entry with the same name,
+# which differs from NSS when the directory is listed first in nsswitch.conf.
+FAST_NSS_ENV = "NSYS_PERMMGR_FAST_NSS"
+
+
+def _fast_nss_enabled() -> bool:
+    """Whether local account files are consulted before NSS"""
+    return os.environ.get(FAST_NSS_ENV) == "1"
+
+
+def _parse_id_file(lines: Iterable[str]) -> Dict[str, int]:
+    """
+    Parse passwd/group formatted lines into a name to numeric ID mapping
+
+    Args:
+        lines: Lines in "name:password:id:..." format
+
+    Returns:
+        dict: Name to ID mapping; the first entry for a name wins, as with NSS
+    """
+    ids = {}
+    for line in lines:
+        if not line.strip() or line.startswith(("#", "+", "-")):
+            continue
+        fields = line.split(":")
+        try:
+            ids.setdefault(fields[0], int(fields[2]))
+        except (IndexError, ValueError):
+            continue
+    return ids
+
+
+@lru_cache(maxsize=None)
+def _load_pw_cache() -> Dict[str, int]:
+    """Read all local user names and UIDs in one pass"""
+    try:
+        with open("/etc/passwd") as passwd:
+            return _parse_id_file(passwd)
+    except OSError:
+        return {entry.pw_name: entry.pw_uid for entry in pwd.getpwall()}
+
+
+@lru_cache(maxsize=None)
+def _load_gr_cache() -> Dict[str, int]:
+    """Read all local group names and GIDs in one pass"""
+    try:
+        with open("/etc/group") as group:
+            return _parse_id_file(group)
+    except OSError:
+        return {entry.gr_name: entry.gr_gid for entry in grp.getgrall()}
+
+
+@lru_cache(maxsize=None)
+def _cached_getpwnam(name: str) -> int:
+    """Resolve a user name to its UID, consulting NSS once per name"""
+    if _fast_nss_enabled():
+        uid = _load_pw_cache().get(name)
+        if uid is not None:
+            return uid
+    return pwd.getpwnam(name).pw_uid
+
+
+@lru_cache(maxsize=None)
+def _cached_getgrnam(name: str) -> int:
+    """Resolve a group name to its GID, consulting NSS once per name"""
+    if _fast_nss_enabled():
+        gid = _load_gr_cache().get(name)
+        if gid is not None:
+            return gid
+    return grp.getgrnam(name).gr_gid
+
+
+def clear_cache() -> None:
+    """Forget all cached user and group name resolutions"""
+    _cached_getpwnam.cache_clear()
+    _cached_getgrnam.cache_clear()
+    _load_pw_cache.cache_clear()
+    _load_gr_cache.cache_clear()
+
 
 class PermissionManager:
     """
@@ -42,7 +127,7 @@ class PermissionManager:
         try:
             if isinstance(owner, int) or (isinstance(owner, str) and owner.isdigit()):
                 return int(owner)
-            return pwd.getpwnam(owner).pw_uid
+            return _cached_getpwnam(owner)
         except (KeyError, ValueError):
             raise ValueError(f"Unable to resolve owner: {owner}")
 
@@ -64,45 +149,55 @@ class PermissionManager:
         try:
             if isinstance(group, int) or (isinstance(group, str) and group.isdigit()):
                 return int(group)
-            return grp.getgrnam(group).gr_gid
+            return _cached_getgrnam(group)
         except (KeyError, ValueError):
             raise ValueError(f"Unable to resolve group: {group}")
 
-    def _set_perms(self, path: str, mode: Optional[str], 
-                   uid: Optional[int], gid: Optional[int]) -> bool:
+    def _set_perms(self, path: str, mode: Optional[int], 
+                   uid: Optional[int], gid: Optional[int],
+                   dir_fd: Optional[int] = None,
+                   st: Optional[os.stat_result] = None) -> bool:
         """
         Set permissions on a single file/directory
 
         Args:
             path: Path to set permissions on
-            mode: Permission mode (octal string)
+            mode: Numeric permission mode (e.g. 0o750)
             uid: Numeric UID
             gid: Numeric GID
+            dir_fd: Optional descriptor of the directory containing path; the
+                    entry is then addressed by its base name relative to it
+                    (fstatat/fchmodat/fchownat) and symlinks are not followed
+            st: Optional current stat result of path (e.g. from DirEntry.stat());
+                when given no stat syscall is made and an entry that already
+                matches costs no syscall at all
 
         Returns:
             bool: Whether any changes were made
         """
         changed = False
+        name = path if dir_fd is None else os.path.basename(path)
+        follow_symlinks = dir_fd is None
         try:
             # Get current state
-            st = os.stat(path)
+            if st is None:
+                st = os.stat(name, dir_fd=dir_fd, follow_symlinks=follow_symlinks)
             current_mode = st.st_mode & 0o777
             current_uid = st.st_uid
             current_gid = st.st_gid
 
             # Update mode if specified and different
-            if mode is not None:
-                mode_int = int(mode, 8)
-                if current_mode != mode_int:
-                    os.chmod(path, mode_int)
-                    changed = True
+            if mode is not None and current_mode != mode:
+                os.chmod(name, mode, dir_fd=dir_fd)
+                changed = True
 
             # Update ownership if different
             if (uid is not None and uid != current_uid) or \
                (gid is not None and gid != current_gid):
-                os.chown(path, 
+                os.chown(name, 
                         uid if uid is not None else -1,
-                        gid if gid is not None else -1)
+                        gid if gid is not None else -1,
+                        dir_fd=dir_fd, follow_symlinks=follow_symlinks)
                 changed = True
 
             return changed
@@ -111,6 +206,51 @@ class PermissionManager:
             self.module.fail_json(
                 msg=f"Failed to set permissions on {path}: {str(e)}")
 
+    def _set_perms_tree(self, path: str, mode: Optional[int],
+                        uid: Optional[int], gid: Optional[int],
+                        parent_fd: Optional[int] = None) -> bool:
+        """
+        Set permissions on everything below a directory
+
+        The tree is walked with os.scandir() on directory descriptors, so each
+        entry is handled relative to its parent instead of resolving its full
+        path again for every syscall. Symbolic links are skipped.
+
+        Args:
+            path: Directory whose contents to update
+            mode: Numeric permission mode (e.g. 0o750)
+            uid: Numeric UID
+            gid: Numeric GID
+            parent_fd: Optional descriptor of the directory containing path,
+                       used to open path relative to it
+
+        Returns:
+            bool: Whether any changes were made
+        """
+        changed = False
+        if parent_fd is None:
+            dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        else:
+            dir_fd = os.open(os.path.basename(path), os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW,
+                             dir_fd=parent_fd)
+        try:
+            with os.scandir(dir_fd) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        continue
+                    entry_path = os.path.join(path, entry.name)
+                    # The scandir entry caches its lstat() result, so no extra stat is issued
+                    if self._set_perms(entry_path, mode, uid, gid, dir_fd=dir_fd,
+                                       st=entry.stat(follow_symlinks=False)):
+                        changed = True
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._set_perms_tree(entry_path, mode, uid, gid, parent_fd=dir_fd):
+                            changed = True
+        finally:
+            os.close(dir_fd)
+
+        return changed
+
     def create_with_permissions(self, path: str, mode: Optional[str],
                               owner: Optional[Union[str, int]], 
                               group: Optional[Union[str, int]],
@@ -132,18 +272,36 @@ class PermissionManager:
             return self.manage_permissions(path, mode, owner, group)
 
         try:
-            # Resolve owner/group before creation
+            # Resolve owner/group/mode before creation
             uid = self._resolve_owner(owner)
             gid = self._resolve_group(group)
+            mode_int = int(mode, 8) if mode is not None else None
 
-            # Create with default permissions first
+            # Create with the requested mode right away so the entry is never
+            # more permissive than asked for; the umask may still strip bits
             if is_directory:
-                os.makedirs(path, exist_ok=True)
+                # A trailing slash would make dirname() return the directory itself
+                path = os.path.normpath(path)
+                parent = os.path.dirname(path)
+                if parent:
+                    os.makedirs(parent, exist_ok=True)
+                os.mkdir(path, mode_int if mode_int is not None else 0o777)
+                self._set_perms(path, mode_int, uid, gid)
             else:
-                open(path, 'a').close()
-
-            # Then set requested permissions
-            self._set_perms(path, mode, uid, gid)
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | os.O_CLOEXEC,
+                             mode_int if mode_int is not None else 0o666)
+                try:
+                    # Fix up through the descriptor, no further path lookups
+                    st = os.fstat(fd)
+                    if mode_int is not None and st.st_mode & 0o777 != mode_int:
+                        os.fchmod(fd, mode_int)
+                    if (uid is not None and uid != st.st_uid) or \
+                       (gid is not None and gid != st.st_gid):
+                        os.fchown(fd,
+                                  uid if uid is not None else -1,
+                                  gid if gid is not None else -1)
+                finally:
+                    os.close(fd)
             return True
 
         except (OSError, IOError) as e:
@@ -167,27 +325,31 @@ class PermissionManager:
         Returns:
             bool: Whether any changes were made
         """
-        if not os.path.exists(path):
-            self.module.fail_json(msg=f"Path does not exist: {path}")
+        # One stat of the root serves the existence check, the directory test
+        # and the permission comparison
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            if e.errno == errno.ENOENT:
+                self.module.fail_json(msg=f"Path does not exist: {path}")
+            self.module.fail_json(
+                msg=f"Failed to manage permissions on {path}: {str(e)}")
 
         try:
             changed = False
             uid = self._resolve_owner(owner)
             gid = self._resolve_group(group)
+            # Parse the octal mode once rather than for every entry
+            mode_int = int(mode, 8) if mode is not None else None
 
             # Update root path
-            if self._set_perms(path, mode, uid, gid):
+            if self._set_perms(path, mode_int, uid, gid, st=st):
                 changed = True
 
             # Recursively update if requested and path is directory
-            if recursive and os.path.isdir(path):
-                for root, dirs, files in os.walk(path):
-                    for d in dirs:
-                        if self._set_perms(os.path.join(root, d), mode, uid, gid):
-                            changed = True
-                    for f in files:
-                        if self._set_perms(os.path.join(root, f), mode, uid, gid):
-                            changed = True
+            if recursive and stat.S_ISDIR(st.st_mode):
+                if self._set_perms_tree(path, mode_int, uid, gid):
+                    changed = True
 
             return changed
 
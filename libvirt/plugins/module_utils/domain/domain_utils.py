@@ -4,9 +4,12 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-import fnmatch
-import xml.etree.ElementTree as ElementTree
-from typing import Dict, List, Optional
+import io
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
 
 try:
     import libvirt
@@ -15,6 +18,116 @@ except ImportError:
 else:
     HAS_LIBVIRT = True
 
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+    HAS_LXML = False
+else:
+    HAS_LXML = True
+
+# Result keys that can only be filled from the domain XML description
+XML_FIELDS = ("memory_info", "disks", "interfaces")
+
+if HAS_LXML:
+    # Compiled once and evaluated by libxml2 instead of walking the tree in Python
+    DISK_XPATH = ElementTree.XPath(".//disk[@device='disk']")
+    INTERFACE_XPATH = ElementTree.XPath(".//interface")
+
+# Stand-in attribute mapping for child elements that are absent
+EMPTY_ATTRIB: Dict[str, str] = {}
+
+# Thread running libvirt's default event loop, once started
+_event_loop_thread: Optional[threading.Thread] = None
+
+
+def _children_by_tag(elem) -> Dict:
+    """
+    Map the tags of an element's direct children to their attribute dicts
+
+    One pass over the children replaces a separate find() scan per child.
+    The first child of a given tag wins, as with find().
+
+    Args:
+        elem: Parent element
+
+    Returns:
+        dict: Tag to attribute mapping
+    """
+    children = {}
+    for child in elem:
+        children.setdefault(child.tag, child.attrib)
+    return children
+
+
+def _disk_entry(elem) -> Dict:
+    """Build the disk information dictionary for a <disk> element"""
+    children = _children_by_tag(elem)
+    source = children.get("source", EMPTY_ATTRIB)
+    target = children.get("target", EMPTY_ATTRIB)
+    driver = children.get("driver", EMPTY_ATTRIB)
+
+    return {
+        "type": elem.get("type"),
+        "device": elem.get("device"),
+        "source": source.get("file"),
+        "target": target.get("dev"),
+        "bus": target.get("bus"),
+        "driver": {
+            "name": driver.get("name"),
+            "type": driver.get("type")
+        }
+    }
+
+
+def _interface_entry(elem) -> Dict:
+    """Build the interface information dictionary for an <interface> element"""
+    children = _children_by_tag(elem)
+    source = children.get("source", EMPTY_ATTRIB)
+
+    return {
+        "type": elem.get("type"),
+        "source": {
+            "network": source.get("network"),
+            "bridge": source.get("bridge")
+        },
+        "model": children.get("model", EMPTY_ATTRIB).get("type"),
+        "mac": children.get("mac", EMPTY_ATTRIB).get("address")
+    }
+
+
+def _memory_entry(memory, currentMemory) -> Dict:
+    """Build the memory information dictionary from the top-level memory elements"""
+    return {
+        "maximum": int(memory.text) if memory is not None else None,
+        "current": int(currentMemory.text) if currentMemory is not None else None,
+        "unit": memory.get("unit") if memory is not None else "KiB"
+    }
+
+
+def start_event_loop() -> bool:
+    """
+    Register libvirt's default event implementation and run it in a daemon thread.
+    Only connections opened afterwards deliver domain events.
+
+    Returns:
+        bool: True if the event loop is running
+    """
+    global _event_loop_thread
+    if _event_loop_thread is None:
+        try:
+            libvirt.virEventRegisterDefaultImpl()
+        except libvirt.libvirtError:
+            return False
+
+        def run():
+            while True:
+                libvirt.virEventRunDefaultImpl()
+
+        _event_loop_thread = threading.Thread(target=run, name="libvirt-events", daemon=True)
+        _event_loop_thread.start()
+    return True
+
 
 class DomainUtils:
     """
@@ -30,41 +143,130 @@ class DomainUtils:
             conn: An active libvirt connection
         """
         self.conn = conn
+        # Domain XML by UUID, tagged with the active state it was fetched in
+        self._xml_cache: Dict[str, Tuple[bool, str]] = {}
 
-    def _extract_disk_info(self, dom_xml: str) -> List[Dict]:
+    def _get_domain_xml(self, domain: libvirt.virDomain, active: Optional[bool] = None) -> str:
         """
-        Extract disk configuration from domain XML
+        Get the XML description of a domain, reusing a cached copy
+
+        The cached copy is used only while the domain's active state is the
+        same as when it was fetched, because starting or stopping a domain
+        changes its live XML.
+
+        Args:
+            domain: Domain object
+            active: Known result of domain.isActive(), to avoid querying it again
+
+        Returns:
+            str: XML description of the domain
+        """
+        uuid = domain.UUIDString()
+        if active is None:
+            active = bool(domain.isActive())
+        cached = self._xml_cache.get(uuid)
+        if cached is not None and cached[0] == active:
+            return cached[1]
+
+        dom_xml = domain.XMLDesc(0)
+        self._xml_cache[uuid] = (active, dom_xml)
+        return dom_xml
+
+    def invalidate_xml_cache(self, domain: Optional[libvirt.virDomain] = None) -> None:
+        """
+        Drop cached XML descriptions after a domain definition changed
+
+        Args:
+            domain: Domain whose entry to drop; all entries when omitted
+        """
+        if domain is None:
+            self._xml_cache.clear()
+        else:
+            self._xml_cache.pop(domain.UUIDString(), None)
+
+    def _extract_all(self, dom_xml: str) -> Dict:
+        """
+        Extract memory, disk and interface configuration from domain XML
+
+        With lxml the XML is parsed once and disks and interfaces are selected
+        with compiled XPath expressions; otherwise it is streamed through
+        _iter_extract().
 
         Args:
             dom_xml: XML description of the domain
 
         Returns:
-            list: List of disk configuration details
+            dict: "memory_info", "disks" and "interfaces" entries
         """
+        if not HAS_LXML:
+            return self._iter_extract(dom_xml)
+
         try:
             root = ElementTree.fromstring(dom_xml)
-            disks = []
-            for disk_elem in root.findall(".//disk"):
-                if disk_elem.get("device") == "disk":
-                    source = disk_elem.find("source")
-                    target = disk_elem.find("target")
-                    driver = disk_elem.find("driver")
-                    
-                    disk_info = {
-                        "type": disk_elem.get("type"),
-                        "device": disk_elem.get("device"),
-                        "source": source.get("file") if source is not None else None,
-                        "target": target.get("dev") if target is not None else None,
-                        "bus": target.get("bus") if target is not None else None,
-                        "driver": {
-                            "name": driver.get("name") if driver is not None else None,
-                            "type": driver.get("type") if driver is not None else None
-                        }
-                    }
-                    disks.append(disk_info)
-            return disks
         except ElementTree.ParseError:
-            return []
+            return {"memory_info": {}, "disks": [], "interfaces": []}
+
+        return {
+            # Only top-level <memory>; <devices> may contain memory hotplug modules
+            "memory_info": _memory_entry(root.find("memory"), root.find("currentMemory")),
+            "disks": [_disk_entry(elem) for elem in DISK_XPATH(root)],
+            "interfaces": [_interface_entry(elem) for elem in INTERFACE_XPATH(root)],
+        }
+
+    def _iter_extract(self, dom_xml: str) -> Dict:
+        """
+        Extract memory, disk and interface configuration with iterparse
+
+        Each disk and interface element is converted as soon as it is complete
+        and then cleared, so the device subtrees are not all kept in memory.
+
+        Args:
+            dom_xml: XML description of the domain
+
+        Returns:
+            dict: "memory_info", "disks" and "interfaces" entries
+        """
+        disks = []
+        interfaces = []
+        top_level = {}
+        depth = 0
+        try:
+            for event, elem in ElementTree.iterparse(io.StringIO(dom_xml), events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+
+                if elem.tag == "disk":
+                    if elem.get("device") == "disk":
+                        disks.append(_disk_entry(elem))
+                    elem.clear()
+                elif elem.tag == "interface":
+                    interfaces.append(_interface_entry(elem))
+                    elem.clear()
+                elif depth == 1 and elem.tag in ("memory", "currentMemory"):
+                    # Direct children of <domain> only, not memory devices
+                    top_level[elem.tag] = elem
+        except ElementTree.ParseError:
+            return {"memory_info": {}, "disks": [], "interfaces": []}
+
+        return {
+            "memory_info": _memory_entry(top_level.get("memory"), top_level.get("currentMemory")),
+            "disks": disks,
+            "interfaces": interfaces,
+        }
+
+    def _extract_disk_info(self, dom_xml: str) -> List[Dict]:
+        """
+        Extract disk configuration from domain XML
+
+        Args:
+            dom_xml: XML description of the domain
+
+        Returns:
+            list: List of disk configuration details
+        """
+        return self._extract_all(dom_xml)["disks"]
 
     def _extract_network_interfaces(self, dom_xml: str) -> List[Dict]:
         """
@@ -76,27 +278,7 @@ class DomainUtils:
         Returns:
             list: List of network interface configuration details
         """
-        try:
-            root = ElementTree.fromstring(dom_xml)
-            interfaces = []
-            for iface_elem in root.findall(".//interface"):
-                source = iface_elem.find("source")
-                model = iface_elem.find("model")
-                mac = iface_elem.find("mac")
-                
-                iface_info = {
-                    "type": iface_elem.get("type"),
-                    "source": {
-                        "network": source.get("network") if source is not None else None,
-                        "bridge": source.get("bridge") if source is not None else None
-                    },
-                    "model": model.get("type") if model is not None else None,
-                    "mac": mac.get("address") if mac is not None else None
-                }
-                interfaces.append(iface_info)
-            return interfaces
-        except ElementTree.ParseError:
-            return []
+        return self._extract_all(dom_xml)["interfaces"]
 
     def _extract_memory_info(self, dom_xml: str) -> Dict:
         """
@@ -108,18 +290,7 @@ class DomainUtils:
         Returns:
             dict: Memory configuration details
         """
-        try:
-            root = ElementTree.fromstring(dom_xml)
-            memory = root.find("memory")
-            currentMemory = root.find("currentMemory")
-            
-            return {
-                "maximum": int(memory.text) if memory is not None else None,
-                "current": int(currentMemory.text) if currentMemory is not None else None,
-                "unit": memory.get("unit") if memory is not None else "KiB"
-            }
-        except ElementTree.ParseError:
-            return {}
+        return self._extract_all(dom_xml)["memory_info"]
 
     def get_raw_xml(self, domain_name: str) -> Optional[str]:
         """
@@ -137,69 +308,158 @@ class DomainUtils:
         except libvirt.libvirtError:
             return None
 
-    def get_domain_info(self, domain_name: str) -> Dict:
+    def build_domain_info(self, domain: libvirt.virDomain, stats: Optional[Dict] = None,
+                          fields: Optional[List[str]] = None) -> Dict:
         """
-        Get detailed information about a specific domain
+        Build the information dictionary for an already resolved domain
 
         Args:
-            domain_name: Name of the domain
+            domain: Domain object
+            stats: Optional stats record from getAllDomainStats(); when it carries
+                   the state, balloon and vcpu fields the info() RPC is skipped
+            fields: Optional list of keys to return; None returns all of them. The
+                    domain XML is only fetched and parsed when one of XML_FIELDS is requested
 
         Returns:
-            dict: Domain information or empty dict if domain not found
-        """
-        try:
-            domain = self.conn.lookupByName(domain_name)
-            dom_xml = domain.XMLDesc(0)
-            dom_info = domain.info()
+            dict: Domain information
 
-            info = {
-                "name": domain_name,
-                "uuid": domain.UUIDString(),
-                "id": domain.ID(),
+        Raises:
+            libvirt.libvirtError: If querying the domain fails
+        """
+        def wanted(*keys):
+            return fields is None or any(key in fields for key in keys)
+
+        info = {"name": domain.name()}
+        if wanted("uuid"):
+            info["uuid"] = domain.UUIDString()
+        if wanted("id"):
+            info["id"] = domain.ID()
+
+        if wanted("state", "max_memory", "memory", "vcpus", "cpu_time"):
+            dom_info = None
+            if stats is not None:
+                dom_info = (
+                    stats.get("state.state"),
+                    stats.get("balloon.maximum"),
+                    stats.get("balloon.current"),
+                    stats.get("vcpu.current"),
+                    stats.get("cpu.time", 0),
+                )
+            if dom_info is None or None in dom_info:
+                dom_info = domain.info()
+            info.update({
                 "state": dom_info[0],
                 "max_memory": dom_info[1],
                 "memory": dom_info[2],
                 "vcpus": dom_info[3],
                 "cpu_time": dom_info[4],
-                "active": domain.isActive(),
-                "persistent": domain.isPersistent(),
-                "autostart": domain.autostart(),
-                "memory_info": self._extract_memory_info(dom_xml),
-                "disks": self._extract_disk_info(dom_xml),
-                "interfaces": self._extract_network_interfaces(dom_xml),
-            }
-            return info
+            })
+
+        active = None
+        if wanted("active"):
+            active = domain.isActive()
+            info["active"] = active
+        if wanted("persistent"):
+            info["persistent"] = domain.isPersistent()
+        if wanted("autostart"):
+            info["autostart"] = domain.autostart()
+
+        if wanted(*XML_FIELDS):
+            info.update(self._extract_all(self._get_domain_xml(
+                domain, bool(active) if active is not None else None)))
+
+        if fields is not None:
+            info = {key: value for key, value in info.items() if key in fields}
+
+        return info
+
+    def get_domain_info(self, domain_name: str, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Get detailed information about a specific domain
+
+        Args:
+            domain_name: Name of the domain
+            fields: Optional list of keys to return, see build_domain_info()
+
+        Returns:
+            dict: Domain information or empty dict if domain not found
+        """
+        try:
+            domain = self.conn.lookupByName(domain_name)
+            return self.build_domain_info(domain, fields=fields)
         except libvirt.libvirtError:
             return {}
 
-    def get_domains_by_pattern(self, pattern: str) -> List[Dict]:
+    def get_domains_by_regex(self, pattern: Optional[Pattern], fields: Optional[List[str]] = None,
+                             flags: int = 0) -> List[Dict]:
         """
-        Get information about domains matching a pattern
+        Get information about domains whose name matches a compiled pattern
 
         Args:
-            pattern: Glob pattern to match domain names
+            pattern: Compiled regular expression, e.g. from compile_glob_union();
+                     None selects every domain without matching names
+            fields: Optional list of keys to return, see build_domain_info()
+            flags: VIR_CONNECT_GET_ALL_DOMAINS_STATS_* filter flags, applied by
+                   libvirtd so non-matching domains are never transferred
 
         Returns:
             list: List of domain information dictionaries
         """
         domains = []
         try:
-            all_domains = (
-                [self.conn.lookupByID(did).name() for did in self.conn.listDomainsID()] +
-                self.conn.listDefinedDomains()
+            stats_types = (
+                libvirt.VIR_DOMAIN_STATS_STATE |
+                libvirt.VIR_DOMAIN_STATS_CPU_TOTAL |
+                libvirt.VIR_DOMAIN_STATS_BALLOON |
+                libvirt.VIR_DOMAIN_STATS_VCPU
             )
-            matching_domains = fnmatch.filter(all_domains, pattern)
-
-            for domain in matching_domains:
-                dom_info = self.get_domain_info(domain)
-                if dom_info:
-                    domains.append(dom_info)
+            try:
+                # Single RPC returning every domain together with the fields info() would give.
+                # NOWAIT skips the monitor query of domains busy with another job instead of
+                # stalling on them; their missing fields are then filled in by info().
+                records = self.conn.getAllDomainStats(
+                    stats_types, flags | getattr(libvirt, "VIR_CONNECT_GET_ALL_DOMAINS_STATS_NOWAIT", 0))
+            except libvirt.libvirtError as e:
+                if e.get_error_code() != libvirt.VIR_ERR_NO_SUPPORT:
+                    raise
+                # Drivers without bulk stats: still a single listing RPC, then info()
+                # for matching domains only. The state filter bits share their values
+                # with the VIR_CONNECT_LIST_DOMAINS_* flags.
+                records = [(domain, None) for domain in self.conn.listAllDomains(flags)]
+
+            for domain, stats in records:
+                if pattern is not None and not pattern.match(domain.name()):
+                    continue
+                try:
+                    domains.append(self.build_domain_info(domain, stats, fields))
+                except libvirt.libvirtError:
+                    # Domain went away between the listing and the detail queries
+                    continue
 
         except libvirt.libvirtError:
             pass
 
         return domains
 
+    def get_domains_by_pattern(self, pattern: str, fields: Optional[List[str]] = None,
+                               flags: int = 0) -> List[Dict]:
+        """
+        Get information about domains matching a pattern
+
+        Args:
+            pattern: Glob pattern to match domain names
+            fields: Optional list of keys to return, see build_domain_info()
+            flags: VIR_CONNECT_GET_ALL_DOMAINS_STATS_* filter flags, see get_domains_by_regex()
+
+        Returns:
+            list: List of domain information dictionaries
+        """
+        if not is_glob(pattern) and not flags:
+            # A literal name matches at most one domain: look it up directly
+            dom_info = self.get_domain_info(pattern, fields)
+            return [dom_info] if dom_info else []
+        return self.get_domains_by_regex(compile_glob_union(pattern), fields, flags)
+
     def get_all_domains(self) -> List[Dict]:
         """
         Get information about all domains
@@ -207,7 +467,27 @@ class DomainUtils:
         Returns:
             list: List of domain information dictionaries
         """
-        return self.get_domains_by_pattern("*")
+        return self.get_domains_by_regex(None)
+
+    def try_lookup(self, domain_name: str) -> Optional[libvirt.virDomain]:
+        """
+        Look up a domain by name
+
+        Args:
+            domain_name: Name of the domain
+
+        Returns:
+            virDomain: Domain object, or None if no such domain exists
+
+        Raises:
+            libvirt.libvirtError: If the lookup fails for any other reason
+        """
+        try:
+            return self.conn.lookupByName(domain_name)
+        except libvirt.libvirtError as e:
+            if e.get_error_code() == libvirt.VIR_ERR_NO_DOMAIN:
+                return None
+            raise
 
     def domain_exists(self, domain_name: str) -> bool:
         """
@@ -219,7 +499,11 @@ class DomainUtils:
         Returns:
             bool: True if domain exists, False otherwise
         """
-        return bool(self.get_domain_info(domain_name))
+        try:
+            self.conn.lookupByName(domain_name)
+            return True
+        except libvirt.libvirtError:
+            return False
 
     def get_domain_state(self, domain_name: str) -> Optional[int]:
         """
@@ -274,14 +558,60 @@ class DomainUtils:
         Returns:
             bool: True if state reached, False if timeout
         """
-        import time
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            current_state = self.get_domain_state(domain.name())
-            if current_state == target_state:
-                return True
-            time.sleep(1)
-        return False
+        monotonic = time.monotonic
+        sleep = time.sleep
+        deadline = monotonic() + timeout
+        delay = 0.05
+        while True:
+            # Query the domain we already hold instead of looking it up again
+            try:
+                if domain.state()[0] == target_state:
+                    return True
+            except libvirt.libvirtError:
+                pass
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return False
+            # Short first waits catch quick transitions, then back off to 1s
+            sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+    def wait_for_shutoff(self, domain: libvirt.virDomain, timeout: int = 30) -> bool:
+        """
+        Wait for a domain to stop, woken by its lifecycle event when the
+        event loop runs and falling back to polling otherwise
+
+        Args:
+            domain: Domain object
+            timeout: Timeout in seconds
+
+        Returns:
+            bool: True if the domain stopped, False if timeout
+        """
+        if _event_loop_thread is not None:
+            stopped = threading.Event()
+
+            def on_lifecycle(conn, dom, event, detail, opaque):
+                if event == libvirt.VIR_DOMAIN_EVENT_STOPPED:
+                    stopped.set()
+
+            try:
+                callback_id = self.conn.domainEventRegisterAny(
+                    domain, libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE, on_lifecycle, None)
+            except libvirt.libvirtError:
+                callback_id = None
+
+            if callback_id is not None:
+                try:
+                    # The domain may have stopped before the callback was registered
+                    return not domain.isActive() or stopped.wait(timeout)
+                finally:
+                    try:
+                        self.conn.domainEventDeregisterAny(callback_id)
+                    except libvirt.libvirtError:
+                        pass
+
+        return self.wait_for_state(domain, libvirt.VIR_DOMAIN_SHUTOFF, timeout)
 
     def manage_power_state(self, domain_name: str, state: str, force: bool = False) -> Dict:
         """
@@ -297,7 +627,8 @@ class DomainUtils:
         """
         try:
             domain = self.conn.lookupByName(domain_name)
-            current_state = self.get_domain_state(domain_name)
+            # Work on the resolved domain; no further lookups by name are needed
+            current_state = domain.state()[0]
             changed = False
 
             if state == 'poweroff':
@@ -327,7 +658,7 @@ class DomainUtils:
 
             return {
                 'changed': changed,
-                'state': self.get_domain_state(domain_name)
+                'state': domain.state()[0]
             }
 
         except libvirt.libvirtError as e:
@@ -359,6 +690,7 @@ class DomainUtils:
                     if domain.isPersistent():
                         domain.undefine()
                         self.conn.defineXML(xml)
+                        self.invalidate_xml_cache(domain)
                     refreshed.append(domain.name())
                 except libvirt.libvirtError as e:
                     failed.append((domain.name(), str(e)))
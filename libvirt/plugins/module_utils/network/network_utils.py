@@ -5,10 +5,18 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
-import fnmatch
-import xml.etree.ElementTree as ElementTree
-from typing import Dict, List, Optional
-import ipaddress
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
 
 try:
     import libvirt
@@ -17,6 +25,89 @@ except ImportError:
 else:
     HAS_LIBVIRT = True
 
+# Upper bound for networks refreshed concurrently
+MAX_WORKERS = 16
+
+# Seconds a fetched network XML description is reused
+XML_CACHE_TTL = 1.0
+
+# Result keys that can only be filled from the network XML description
+XML_FIELDS = ("bridge", "bridge_details", "ip_info")
+
+# Netmask for every IPv4 prefix length, indexed by prefix
+MASKS = [((1 << 32) - 1) ^ ((1 << (32 - p)) - 1) for p in range(33)]
+
+
+def _ipv4_to_u32(addr: str) -> int:
+    """
+    Convert a dotted-quad IPv4 address to an integer
+
+    Args:
+        addr: IPv4 address (e.g., "192.168.1.1")
+
+    Returns:
+        int: Address as unsigned 32-bit integer
+
+    Raises:
+        ValueError: If the address is not a dotted-quad IPv4 address
+    """
+    parts = addr.split(".")
+    if len(parts) != 4:
+        raise ValueError(f"Invalid IPv4 address: {addr}")
+    value = 0
+    for part in parts:
+        # Plain decimal octets only, a leading zero could be read as octal
+        if (not part.isascii() or not part.isdigit() or len(part) > 3
+                or (len(part) > 1 and part[0] == "0") or int(part) > 255):
+            raise ValueError(f"Invalid IPv4 address: {addr}")
+        value = (value << 8) | int(part)
+    return value
+
+
+def _cidr_to_u32(addr: str, mask: str) -> Tuple[int, int]:
+    """
+    Compute the network of an address and netmask as integers
+
+    Args:
+        addr: IPv4 address inside the network
+        mask: Dotted-quad netmask (e.g., "255.255.255.0") or prefix length
+
+    Returns:
+        tuple: (network_int, prefix_len)
+
+    Raises:
+        ValueError: If the address or netmask is invalid
+    """
+    if "." in mask:
+        mask_int = _ipv4_to_u32(mask)
+        prefix = bin(mask_int).count("1")
+        if MASKS[prefix] != mask_int:
+            raise ValueError(f"Invalid netmask: {mask}")
+    else:
+        if not mask.isascii() or not mask.isdigit():
+            raise ValueError(f"Invalid prefix length: {mask}")
+        prefix = int(mask)
+        if not 0 <= prefix <= 32:
+            raise ValueError(f"Invalid prefix length: {mask}")
+    return _ipv4_to_u32(addr) & MASKS[prefix], prefix
+
+
+def _parse_cidr(cidr: str) -> Tuple[int, int]:
+    """
+    Parse a CIDR string into integers, host bits are ignored
+
+    Args:
+        cidr: Network CIDR (e.g., "192.168.1.0/24"); a bare address is a /32
+
+    Returns:
+        tuple: (network_int, prefix_len)
+
+    Raises:
+        ValueError: If the CIDR is invalid
+    """
+    addr, _, mask = cidr.partition("/")
+    return _cidr_to_u32(addr, mask or "32")
+
 
 class NetworkUtils:
     """
@@ -32,110 +123,213 @@ class NetworkUtils:
             conn: An active libvirt connection
         """
         self.conn = conn
+        # CIDR index filled lazily from _cidr_source, see _find_by_cidr()
+        self._cidr_cache: Dict[Tuple[int, int], Dict] = {}
+        self._cidr_source: Optional[Iterator[Dict]] = None
+        # Network XML by name, with the monotonic time it was fetched
+        self._xml_cache: Dict[str, Tuple[float, str]] = {}
 
-    def _extract_bridge_info(self, net_xml: str) -> Dict:
+    def _get_xml(self, network: libvirt.virNetwork) -> str:
         """
-        Extract bridge configuration from network XML
+        Get the XML description of a network, reusing a copy fetched within XML_CACHE_TTL
 
         Args:
-            net_xml: XML description of the network
+            network: Network object
+
+        Returns:
+            str: XML description of the network
+        """
+        name = network.name()
+        now = time.monotonic()
+        cached = self._xml_cache.get(name)
+        if cached is not None and now - cached[0] < XML_CACHE_TTL:
+            return cached[1]
+
+        xml = network.XMLDesc(0)
+        self._xml_cache[name] = (now, xml)
+        return xml
+
+    def invalidate_xml_cache(self, name: Optional[str] = None) -> None:
+        """
+        Drop cached XML descriptions after a network was changed
+
+        Args:
+            name: Network whose entry to drop; all entries when omitted
+        """
+        if name is None:
+            self._xml_cache.clear()
+        else:
+            self._xml_cache.pop(name, None)
+
+    def _extract_bridge_info(self, root: ElementTree.Element) -> Dict:
+        """
+        Extract bridge configuration from parsed network XML
+
+        Args:
+            root: Root element of the network XML description
 
         Returns:
             dict: Bridge configuration details
         """
-        try:
-            root = ElementTree.fromstring(net_xml)
-            bridge_elem = root.find(".//bridge")
-            if bridge_elem is not None:
-                return {
-                    "name": bridge_elem.get("name", ""),
-                    "stp": bridge_elem.get("stp", "on") == "on",
-                    "delay": int(bridge_elem.get("delay", 0))
-                }
-        except ElementTree.ParseError:
-            pass
+        bridge_elem = root.find("bridge")
+        if bridge_elem is not None:
+            return {
+                "name": bridge_elem.get("name", ""),
+                "stp": bridge_elem.get("stp", "on") == "on",
+                "delay": int(bridge_elem.get("delay", 0))
+            }
         return {}
 
-    def _extract_ip_info(self, net_xml: str) -> Dict:
+    def _extract_ip_info(self, root: ElementTree.Element) -> Dict:
         """
-        Extract IP configuration from network XML
+        Extract IP configuration from parsed network XML
 
         Args:
-            net_xml: XML description of the network
+            root: Root element of the network XML description
 
         Returns:
             dict: IP configuration details
         """
-        try:
-            root = ElementTree.fromstring(net_xml)
-            ip_elem = root.find(".//ip")
-            if ip_elem is not None:
-                ip_info = {
-                    "address": ip_elem.get("address"),
-                    "netmask": ip_elem.get("netmask"),
-                    "dhcp_range": None
+        ip_elem = root.find("ip")
+        if ip_elem is not None:
+            ip_info = {
+                "address": ip_elem.get("address"),
+                "netmask": ip_elem.get("netmask"),
+                "dhcp_range": None
+            }
+
+            # Calculate CIDR if address and netmask are present
+            if ip_info["address"] and ip_info["netmask"]:
+                try:
+                    network_int, prefix = _cidr_to_u32(ip_info["address"], ip_info["netmask"])
+                    ip_info["cidr"] = f"{socket.inet_ntoa(struct.pack('>I', network_int))}/{prefix}"
+                except ValueError:
+                    ip_info["cidr"] = None
+
+            # Check for DHCP range
+            dhcp_elem = ip_elem.find("dhcp/range")
+            if dhcp_elem is not None:
+                ip_info["dhcp_range"] = {
+                    "start": dhcp_elem.get("start"),
+                    "end": dhcp_elem.get("end")
                 }
 
-                # Calculate CIDR if address and netmask are present
-                if ip_info["address"] and ip_info["netmask"]:
-                    try:
-                        network = ipaddress.IPv4Network(
-                            f"{ip_info['address']}/{ip_info['netmask']}",
-                            strict=False
-                        )
-                        ip_info["cidr"] = str(network)
-                    except ValueError:
-                        ip_info["cidr"] = None
-
-                # Check for DHCP range
-                dhcp_elem = ip_elem.find(".//range")
-                if dhcp_elem is not None:
-                    ip_info["dhcp_range"] = {
-                        "start": dhcp_elem.get("start"),
-                        "end": dhcp_elem.get("end")
-                    }
-
-                return ip_info
-        except ElementTree.ParseError:
-            pass
+            return ip_info
         return {}
 
-    def get_network_info(self, network_name: str) -> Dict:
+    def _build_network_info(self, network: libvirt.virNetwork,
+                            fields: Optional[List[str]] = None) -> Dict:
+        """
+        Build the information dictionary for an already resolved network
+
+        Args:
+            network: Network object
+            fields: Optional list of keys to return; None returns all of them. The
+                    network XML is only fetched and parsed when one of XML_FIELDS is requested
+
+        Returns:
+            dict: Network information
+
+        Raises:
+            libvirt.libvirtError: If querying the network fails
+        """
+        def wanted(*keys):
+            return fields is None or any(key in fields for key in keys)
+
+        info = {"name": network.name()}
+        if wanted("uuid"):
+            info["uuid"] = network.UUIDString()
+        if wanted("active"):
+            info["active"] = network.isActive()
+        if wanted("persistent"):
+            info["persistent"] = network.isPersistent()
+        if wanted("autostart"):
+            info["autostart"] = network.autostart()
+
+        if wanted(*XML_FIELDS):
+            info["bridge"] = None
+            info["ip_info"] = None
+            try:
+                root = ElementTree.fromstring(self._get_xml(network))
+            except ElementTree.ParseError:
+                root = None
+
+            if root is not None:
+                bridge_info = self._extract_bridge_info(root)
+                if bridge_info:
+                    info["bridge"] = bridge_info.get("name")
+                    info["bridge_details"] = bridge_info
+
+                ip_info = self._extract_ip_info(root)
+                if ip_info:
+                    info["ip_info"] = ip_info
+
+        if fields is not None:
+            info = {key: value for key, value in info.items() if key in fields}
+
+        return info
+
+    def get_network_info(self, network_name: str, fields: Optional[List[str]] = None) -> Dict:
         """
         Get detailed information about a specific network
 
         Args:
             network_name: Name of the network
+            fields: Optional list of keys to return, see _build_network_info()
 
         Returns:
             dict: Network information or empty dict if network not found
         """
         try:
             network = self.conn.networkLookupByName(network_name)
-            net_xml = network.XMLDesc(0)
-
-            info = {
-                "name": network_name,
-                "uuid": network.UUIDString(),
-                "active": network.isActive(),
-                "persistent": network.isPersistent(),
-                "autostart": network.autostart(),
-                "bridge": None,
-                "ip_info": None
-            }
+            return self._build_network_info(network, fields=fields)
+        except libvirt.libvirtError:
+            return {}
 
-            bridge_info = self._extract_bridge_info(net_xml)
-            if bridge_info:
-                info["bridge"] = bridge_info.get("name")
-                info["bridge_details"] = bridge_info
+    def iter_networks_by_regex(self, pattern: Optional[Pattern],
+                               fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield information about networks whose name matches a compiled pattern
 
-            ip_info = self._extract_ip_info(net_xml)
-            if ip_info:
-                info["ip_info"] = ip_info
+        Network details are queried lazily as the caller consumes the iterator.
 
-            return info
+        Args:
+            pattern: Compiled regular expression, e.g. from compile_glob_union();
+                     None selects every network without matching names
+            fields: Optional list of keys to return, see _build_network_info()
+
+        Yields:
+            dict: Network information
+        """
+        try:
+            # One listing RPC covers both active and inactive networks
+            all_networks = self.conn.listAllNetworks(0)
         except libvirt.libvirtError:
-            return {}
+            return
+
+        for network in all_networks:
+            if pattern is not None and not pattern.match(network.name()):
+                continue
+            try:
+                yield self._build_network_info(network, fields=fields)
+            except libvirt.libvirtError:
+                # Network went away between the listing and the detail queries
+                continue
+
+    def get_networks_by_regex(self, pattern: Optional[Pattern],
+                              fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get information about networks whose name matches a compiled pattern
+
+        Args:
+            pattern: Compiled regular expression, e.g. from compile_glob_union();
+                     None selects every network without matching names
+            fields: Optional list of keys to return, see _build_network_info()
+
+        Returns:
+            list: List of network information dictionaries
+        """
+        return list(self.iter_networks_by_regex(pattern, fields=fields))
 
     def get_networks_by_pattern(self, pattern: str) -> List[Dict]:
         """
@@ -147,23 +341,20 @@ class NetworkUtils:
         Returns:
             list: List of network information dictionaries
         """
-        networks = []
-        try:
-            all_networks = (
-                self.conn.listNetworks() +
-                self.conn.listDefinedNetworks()
-            )
-            matching_networks = fnmatch.filter(all_networks, pattern)
-
-            for network in matching_networks:
-                net_info = self.get_network_info(network)
-                if net_info:
-                    networks.append(net_info)
+        if not is_glob(pattern):
+            # A literal name matches at most one network: skip listing them all
+            net_info = self.get_network_info(pattern)
+            return [net_info] if net_info else []
+        return self.get_networks_by_regex(compile_glob_union(pattern))
 
-        except libvirt.libvirtError:
-            pass
+    def iter_all_networks(self) -> Iterator[Dict]:
+        """
+        Yield information about all networks, one network at a time
 
-        return networks
+        Yields:
+            dict: Network information
+        """
+        return self.iter_networks_by_regex(None)
 
     def get_all_networks(self) -> List[Dict]:
         """
@@ -172,7 +363,7 @@ class NetworkUtils:
         Returns:
             list: List of network information dictionaries
         """
-        return self.get_networks_by_pattern("*")
+        return list(self.iter_all_networks())
 
     def network_exists(self, network_name: str) -> bool:
         """
@@ -184,7 +375,44 @@ class NetworkUtils:
         Returns:
             bool: True if network exists, False otherwise
         """
-        return bool(self.get_network_info(network_name))
+        try:
+            self.conn.networkLookupByName(network_name)
+            return True
+        except libvirt.libvirtError:
+            return False
+
+    def _find_by_cidr(self, key: Tuple[int, int]) -> Optional[Dict]:
+        """
+        Look a network up in the CIDR index, extending the index on a miss
+
+        Networks are pulled from a single iter_all_networks() pass only
+        until the requested CIDR shows up, so a match early in the listing
+        spares the details of the remaining networks. The index and the
+        pending pass live as long as this instance; refresh_network() drops them.
+
+        Args:
+            key: (network_int, prefix_len) of the wanted network
+
+        Returns:
+            Optional[dict]: Network information or None if not found
+        """
+        if key in self._cidr_cache:
+            return self._cidr_cache[key]
+
+        if self._cidr_source is None:
+            self._cidr_source = self.iter_all_networks()
+
+        for network in self._cidr_source:
+            net_cidr = (network.get("ip_info") or {}).get("cidr")
+            net_key = _parse_cidr(net_cidr) if net_cidr else None
+            if net_key is None or net_key in self._cidr_cache:
+                # Keep the first network listed for a CIDR
+                continue
+            self._cidr_cache[net_key] = network
+            if net_key == key:
+                return network
+
+        return None
 
     def get_network_by_cidr(self, cidr: str) -> Optional[Dict]:
         """
@@ -197,35 +425,46 @@ class NetworkUtils:
             Optional[dict]: Network information or None if not found
         """
         try:
-            target_network = ipaddress.IPv4Network(cidr, strict=False)
-
-            for network in self.get_all_networks():
-                if (network.get("ip_info") and
-                    network["ip_info"].get("cidr")):
-                    try:
-                        net_cidr = ipaddress.IPv4Network(
-                            network["ip_info"]["cidr"],
-                            strict=False
-                        )
-                        if net_cidr == target_network:
-                            return network
-                    except ValueError:
-                        continue
+            target_network = _parse_cidr(cidr)
         except ValueError:
-            pass
+            return None
 
-        return None
+        return self._find_by_cidr(target_network)
+
+    def _refresh_one(self, network: libvirt.virNetwork) -> Tuple[str, Optional[str]]:
+        """
+        Restart a single network if it is active
+
+        Args:
+            network: Network object
+
+        Returns:
+            tuple: (name, error message or None)
+        """
+        try:
+            if network.isActive():
+                # Force a refresh of the network's state
+                network.destroy()
+                network.create()
+            return network.name(), None
+        except libvirt.libvirtError as e:
+            return network.name(), str(e)
 
     def refresh_network(self, network_name: str = None) -> tuple[bool, str]:
         """
         Refresh network state to ensure up-to-date information
 
+        Networks are restarted concurrently, they do not depend on each other.
+
         Args:
             network_name: Optional name of specific network to refresh
 
         Returns:
             tuple: (success, message)
         """
+        self._cidr_cache = {}
+        self._cidr_source = None
+        self.invalidate_xml_cache(network_name)
         try:
             if network_name:
                 networks = [self.conn.networkLookupByName(network_name)]
@@ -235,15 +474,12 @@ class NetworkUtils:
             refreshed = []
             failed = []
 
-            for network in networks:
-                try:
-                    if network.isActive():
-                        # Force a refresh of the network's state
-                        network.destroy()
-                        network.create()
-                    refreshed.append(network.name())
-                except libvirt.libvirtError as e:
-                    failed.append((network.name(), str(e)))
+            with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(networks)))) as executor:
+                for name, error in executor.map(self._refresh_one, networks):
+                    if error is None:
+                        refreshed.append(name)
+                    else:
+                        failed.append((name, error))
 
             if failed:
                 failures = '; '.join([f"{name}: {error}" for name, error in failed])
@@ -2,10 +2,17 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
-import fnmatch
 import time
-import xml.etree.ElementTree as ElementTree
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
 
 try:
     import libvirt
@@ -14,6 +21,31 @@ except ImportError:
 else:
     HAS_LIBVIRT = True
 
+# Upper bound for pools refreshed concurrently
+MAX_WORKERS = 16
+
+# Seconds a fetched pool XML description is reused
+XML_CACHE_TTL = 1.0
+
+# Result keys that can only be filled from the pool XML description
+XML_FIELDS = ("type", "target_info", "source_info")
+
+# Result keys filled from pool.info()
+INFO_FIELDS = ("state", "capacity", "allocation", "available", "active")
+
+if HAS_LIBVIRT:
+    # Pool states reported by info() for pools that are not active
+    INACTIVE_POOL_STATES = frozenset((
+        libvirt.VIR_STORAGE_POOL_INACTIVE,
+        libvirt.VIR_STORAGE_POOL_BUILDING,
+    ))
+
+    # Error codes worth retrying a pool activation for
+    TRANSIENT_ERROR_CODES = frozenset((
+        libvirt.VIR_ERR_OPERATION_INVALID,
+        libvirt.VIR_ERR_OPERATION_TIMEOUT,
+        libvirt.VIR_ERR_RPC,
+    ))
 
 
 class StoragePoolUtils:
@@ -30,136 +62,245 @@ class StoragePoolUtils:
             conn: An active libvirt connection
         """
         self.conn = conn
+        # Pool XML by name, with the monotonic time it was fetched
+        self._xml_cache: Dict[str, Tuple[float, str]] = {}
+
+    def _get_xml(self, pool: libvirt.virStoragePool) -> str:
+        """
+        Get the XML description of a pool, reusing a copy fetched within XML_CACHE_TTL
+
+        Args:
+            pool: Pool object
+
+        Returns:
+            str: XML description of the pool
+        """
+        name = pool.name()
+        now = time.monotonic()
+        cached = self._xml_cache.get(name)
+        if cached is not None and now - cached[0] < XML_CACHE_TTL:
+            return cached[1]
+
+        xml = pool.XMLDesc(0)
+        self._xml_cache[name] = (now, xml)
+        return xml
+
+    def invalidate_xml_cache(self, name: Optional[str] = None) -> None:
+        """
+        Drop cached XML descriptions after a pool was changed
+
+        Args:
+            name: Pool whose entry to drop; all entries when omitted
+        """
+        if name is None:
+            self._xml_cache.clear()
+        else:
+            self._xml_cache.pop(name, None)
 
-    def _extract_target_info(self, pool_xml: str) -> Dict:
+    def _extract_target_info(self, root: ElementTree.Element) -> Dict:
         """
-        Extract target configuration from pool XML
+        Extract target configuration from parsed pool XML
 
         Args:
-            pool_xml: XML description of the pool
+            root: Root element of the pool XML description
 
         Returns:
             dict: Target configuration details
         """
-        try:
-            root = ElementTree.fromstring(pool_xml)
-            target_elem = root.find(".//target")
-            if target_elem is not None:
-                path_elem = target_elem.find("path")
-                perms_elem = target_elem.find("permissions")
-
-                target_info = {
-                    "path": path_elem.text if path_elem is not None else None,
-                    "permissions": {}
-                }
-
-                if perms_elem is not None:
-                    for perm in ["mode", "owner", "group"]:
-                        elem = perms_elem.find(perm)
-                        if elem is not None:
-                            target_info["permissions"][perm] = elem.text
-
-                return target_info
-        except ElementTree.ParseError:
-            pass
+        target_elem = root.find("target")
+        if target_elem is not None:
+            path_elem = target_elem.find("path")
+            perms_elem = target_elem.find("permissions")
+
+            target_info = {
+                "path": path_elem.text if path_elem is not None else None,
+                "permissions": {}
+            }
+
+            if perms_elem is not None:
+                for perm in ["mode", "owner", "group"]:
+                    elem = perms_elem.find(perm)
+                    if elem is not None:
+                        target_info["permissions"][perm] = elem.text
+
+            return target_info
         return {}
 
-    def _extract_source_info(self, pool_xml: str) -> Dict:
+    def _extract_source_info(self, root: ElementTree.Element) -> Dict:
         """
-        Extract source configuration from pool XML
+        Extract source configuration from parsed pool XML
 
         Args:
-            pool_xml: XML description of the pool
+            root: Root element of the pool XML description
 
         Returns:
             dict: Source configuration details
         """
-        try:
-            root = ElementTree.fromstring(pool_xml)
-            source_elem = root.find(".//source")
-            if source_elem is not None:
-                source_info = {}
-
-                # Extract device info if present
-                device = source_elem.find("device")
-                if device is not None:
-                    source_info["device"] = device.get("path")
-
-                # Extract host info if present
-                host = source_elem.find("host")
-                if host is not None:
-                    source_info["host"] = host.get("name")
-
-                # Extract format info if present
-                format_elem = source_elem.find("format")
-                if format_elem is not None:
-                    source_info["format"] = format_elem.get("type")
-
-                return source_info
-        except ElementTree.ParseError:
-            pass
+        source_elem = root.find("source")
+        if source_elem is not None:
+            source_info = {}
+
+            # Extract device info if present
+            device = source_elem.find("device")
+            if device is not None:
+                source_info["device"] = device.get("path")
+
+            # Extract host info if present
+            host = source_elem.find("host")
+            if host is not None:
+                source_info["host"] = host.get("name")
+
+            # Extract format info if present
+            format_elem = source_elem.find("format")
+            if format_elem is not None:
+                source_info["format"] = format_elem.get("type")
+
+            return source_info
         return {}
 
-    def get_pool_info(self, pool_name: str) -> Dict:
+    def _build_pool_info(self, pool: libvirt.virStoragePool,
+                         persistent: Optional[bool] = None,
+                         autostart: Optional[bool] = None,
+                         fields: Optional[List[str]] = None) -> Dict:
         """
-        Get detailed information about a specific storage pool
+        Build the information dictionary for a storage pool object
+
+        The active flag is derived from the state returned by info(); the
+        persistent and autostart flags are queried only when not supplied.
 
         Args:
-            pool_name: Name of the storage pool
+            pool: libvirt storage pool object
+            persistent: Known persistence of the pool, e.g. from a filtered listing
+            autostart: Known autostart setting of the pool, e.g. from a filtered listing
+            fields: Optional list of keys to return; None returns all of them. The
+                    pool XML is only fetched and parsed when one of XML_FIELDS is requested
 
         Returns:
-            dict: Pool information or empty dict if pool not found
+            dict: Pool information
         """
-        try:
-            pool = self.conn.storagePoolLookupByName(pool_name)
-            pool_xml = pool.XMLDesc(0)
-            pool_info = pool.info()
+        def wanted(*keys):
+            return fields is None or any(key in fields for key in keys)
+
+        info = {"name": pool.name()}
+        if wanted("uuid"):
+            info["uuid"] = pool.UUIDString()
 
-            info = {
-                "name": pool_name,
-                "uuid": pool.UUIDString(),
+        if wanted(*INFO_FIELDS):
+            pool_info = pool.info()
+            info.update({
                 "state": pool_info[0],
                 "capacity": pool_info[1],
                 "allocation": pool_info[2],
                 "available": pool_info[3],
-                "active": pool.isActive(),
-                "persistent": pool.isPersistent(),
-                "autostart": pool.autostart(),
-                "type": ElementTree.fromstring(pool_xml).get("type"),
-                "target_info": self._extract_target_info(pool_xml),
-                "source_info": self._extract_source_info(pool_xml)
-            }
-            return info
+                "active": int(pool_info[0] not in INACTIVE_POOL_STATES),
+            })
+
+        if wanted("persistent"):
+            info["persistent"] = int(pool.isPersistent() if persistent is None else persistent)
+        if wanted("autostart"):
+            info["autostart"] = int(pool.autostart() if autostart is None else autostart)
+
+        if wanted(*XML_FIELDS):
+            root = ElementTree.fromstring(self._get_xml(pool))
+            info.update({
+                "type": root.get("type"),
+                "target_info": self._extract_target_info(root),
+                "source_info": self._extract_source_info(root)
+            })
+
+        if fields is not None:
+            info = {key: value for key, value in info.items() if key in fields}
+
+        return info
+
+    def get_pool_info(self, pool_name: str, fields: Optional[List[str]] = None) -> Dict:
+        """
+        Get detailed information about a specific storage pool
+
+        Args:
+            pool_name: Name of the storage pool
+            fields: Optional list of keys to return, see _build_pool_info()
+
+        Returns:
+            dict: Pool information or empty dict if pool not found
+        """
+        try:
+            pool = self.conn.storagePoolLookupByName(pool_name)
+            return self._build_pool_info(pool, fields=fields)
         except libvirt.libvirtError:
             return {}
 
-    def get_pools_by_pattern(self, pattern: str) -> List[Dict]:
+    def iter_pools_by_pattern(self, pattern: str, fields: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield information about pools matching a pattern
+
+        Pool details are queried lazily as the caller consumes the iterator.
+
+        Args:
+            pattern: Glob pattern to match pool names
+            fields: Optional list of keys to return, see _build_pool_info()
+
+        Yields:
+            dict: Pool information
+        """
+        if not is_glob(pattern):
+            # A literal name matches at most one pool: skip listing them all
+            pool_info = self.get_pool_info(pattern, fields=fields)
+            if pool_info:
+                yield pool_info
+            return
+
+        try:
+            # One RPC returns active and inactive pool objects, no per-name lookup needed
+            all_pools = self.conn.listAllStoragePools(0)
+            if pattern != "*":
+                regex = compile_glob_union(pattern)
+                all_pools = [pool for pool in all_pools if regex.match(pool.name())]
+
+            # Filtered listings replace a persistence and an autostart RPC per pool
+            persistent = autostart = None
+            if all_pools and (fields is None or "persistent" in fields):
+                persistent = {pool.name() for pool in self.conn.listAllStoragePools(
+                    libvirt.VIR_CONNECT_LIST_STORAGE_POOLS_PERSISTENT)}
+            if all_pools and (fields is None or "autostart" in fields):
+                autostart = {pool.name() for pool in self.conn.listAllStoragePools(
+                    libvirt.VIR_CONNECT_LIST_STORAGE_POOLS_AUTOSTART)}
+        except libvirt.libvirtError:
+            return
+
+        for pool in all_pools:
+            name = pool.name()
+            try:
+                yield self._build_pool_info(
+                    pool,
+                    persistent=name in persistent if persistent is not None else None,
+                    autostart=name in autostart if autostart is not None else None,
+                    fields=fields)
+            except libvirt.libvirtError:
+                # Pool vanished between listing and querying
+                continue
+
+    def get_pools_by_pattern(self, pattern: str, fields: Optional[List[str]] = None) -> List[Dict]:
         """
         Get information about pools matching a pattern
 
         Args:
             pattern: Glob pattern to match pool names
+            fields: Optional list of keys to return, see _build_pool_info()
 
         Returns:
             list: List of pool information dictionaries
         """
-        pools = []
-        try:
-            all_pools = (
-                    self.conn.listStoragePools() +
-                    self.conn.listDefinedStoragePools()
-            )
-            matching_pools = fnmatch.filter(all_pools, pattern)
-
-            for pool in matching_pools:
-                pool_info = self.get_pool_info(pool)
-                if pool_info:
-                    pools.append(pool_info)
+        return list(self.iter_pools_by_pattern(pattern, fields=fields))
 
-        except libvirt.libvirtError:
-            pass
+    def iter_all_pools(self) -> Iterator[Dict]:
+        """
+        Yield information about all storage pools, one pool at a time
 
-        return pools
+        Yields:
+            dict: Pool information
+        """
+        return self.iter_pools_by_pattern("*")
 
     def get_all_pools(self) -> List[Dict]:
         """
@@ -168,7 +309,7 @@ class StoragePoolUtils:
         Returns:
             list: List of pool information dictionaries
         """
-        return self.get_pools_by_pattern("*")
+        return list(self.iter_all_pools())
 
     def pool_exists(self, pool_name: str) -> bool:
         """
@@ -180,7 +321,26 @@ class StoragePoolUtils:
         Returns:
             bool: True if pool exists, False otherwise
         """
-        return bool(self.get_pool_info(pool_name))
+        try:
+            self.conn.storagePoolLookupByName(pool_name)
+            return True
+        except libvirt.libvirtError:
+            return False
+
+    def _is_transient_error(self, error: libvirt.libvirtError) -> bool:
+        """
+        Check whether a failed pool operation may succeed when retried
+
+        Args:
+            error: Error raised by libvirt
+
+        Returns:
+            bool: True for timeouts, RPC failures and lock contention
+        """
+        code = error.get_error_code()
+        if code in TRANSIENT_ERROR_CODES:
+            return True
+        return code == libvirt.VIR_ERR_INTERNAL_ERROR and "lock" in str(error).lower()
 
     def manage_pool_state(self, pool: libvirt.virStoragePool,
                           desired_state: str, autostart: bool,
@@ -188,12 +348,15 @@ class StoragePoolUtils:
         """
         Manage pool state (active/inactive) and autostart with retry mechanism
 
+        Activation is retried with exponential backoff only for transient
+        errors; any other libvirt error fails immediately.
+
         Args:
             pool: Storage pool object
             desired_state: Desired state ('active', 'inactive')
             autostart: Whether pool should autostart
             max_retries: Maximum number of activation attempts
-            retry_delay: Delay between retries in seconds
+            retry_delay: Delay before the first retry in seconds, doubled for each further retry
 
         Returns:
             tuple: (changed, message)
@@ -212,33 +375,31 @@ class StoragePoolUtils:
                 )
 
             # Handle activation state
-            current_state = "active" if pool.isActive() else "inactive"
+            is_active = pool.isActive()
+            current_state = "active" if is_active else "inactive"
 
             if desired_state != current_state:
-                if desired_state == "active" and not pool.isActive():
-                    retry_count = 0
+                if desired_state == "active" and not is_active:
                     last_error = None
 
-                    while retry_count < max_retries:
+                    for attempt in range(max_retries):
                         try:
                             if pool.create() == 0:  # Success
                                 changed = True
                                 messages.append("Activated pool")
                                 break
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                time.sleep(retry_delay)
                         except libvirt.libvirtError as e:
+                            if not self._is_transient_error(e):
+                                raise
                             last_error = e
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                time.sleep(retry_delay)
-
-                    if retry_count == max_retries:
+                        # No point sleeping after the last attempt
+                        if attempt + 1 < max_retries:
+                            time.sleep(retry_delay * (2 ** attempt))
+                    else:
                         error_msg = str(last_error) if last_error else "Failed to activate pool"
                         raise libvirt.libvirtError(error_msg)
 
-                elif desired_state == "inactive" and pool.isActive():
+                elif desired_state == "inactive" and is_active:
                     pool.destroy()
                     changed = True
                     messages.append("Deactivated pool")
@@ -247,6 +408,8 @@ class StoragePoolUtils:
 
         except libvirt.libvirtError as e:
             raise Exception(f"Failed to manage pool state: {str(e)}")
+        finally:
+            self.invalidate_xml_cache(pool.name())
 
     def build_pool_xml(self, name: str, pool_type: str, target_path: str,
                        source_path: Optional[str] = None,
@@ -268,73 +431,87 @@ class StoragePoolUtils:
         Returns:
             str: Pool XML configuration
         """
-        pool = ElementTree.Element('pool', type=pool_type)
-
-        # Add name
-        name_elem = ElementTree.SubElement(pool, 'name')
-        name_elem.text = name
-
-        # Add source configuration if provided
+        # The document has a fixed shape, so it is formatted directly;
+        # every value is escaped for its text or attribute position
+        source_frag = ''
         if any([source_path, source_host, source_format]):
-            source = ElementTree.SubElement(pool, 'source')
+            source_frag = '<source>'
             if source_path:
-                ElementTree.SubElement(source, 'device', path=source_path)
+                source_frag += f'<device path={quoteattr(source_path)}/>'
             if source_host:
-                ElementTree.SubElement(source, 'host', name=source_host)
+                source_frag += f'<host name={quoteattr(source_host)}/>'
             if source_format:
-                ElementTree.SubElement(source, 'format', type=source_format)
-
-        # Add target configuration
-        target = ElementTree.SubElement(pool, 'target')
-        path = ElementTree.SubElement(target, 'path')
-        path.text = target_path
+                source_frag += f'<format type={quoteattr(source_format)}/>'
+            source_frag += '</source>'
 
-        # Add permissions if provided
+        perms_frag = ''
         if target_permissions:
-            perms = ElementTree.SubElement(target, 'permissions')
+            perms_frag = '<permissions>'
             for perm_type in ['mode', 'owner', 'group']:
                 if perm_type in target_permissions and target_permissions[perm_type] is not None:
-                    perm_elem = ElementTree.SubElement(perms, perm_type)
-                    perm_elem.text = str(target_permissions[perm_type])
+                    perms_frag += f'<{perm_type}>{escape(str(target_permissions[perm_type]))}</{perm_type}>'
+            perms_frag += '</permissions>'
 
-        # Add XML declaration and ensure proper formatting
-        xml_declaration = '<?xml version="1.0" encoding="utf-8"?>\n'
-        pool_xml = ElementTree.tostring(pool, encoding='unicode', method='xml')
-        return xml_declaration + pool_xml
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<pool type={quoteattr(pool_type)}><name>{escape(name)}</name>{source_frag}'
+            f'<target><path>{escape(target_path)}</path>{perms_frag}</target></pool>'
+        )
 
-    def refresh_pool(self, pool_name: str = None) -> Tuple[bool, str]:
+    def _refresh_one(self, pool: libvirt.virStoragePool) -> Tuple[str, bool, Optional[str]]:
+        """
+        Refresh a single pool if it is active
+
+        Args:
+            pool: Storage pool object
+
+        Returns:
+            tuple: (name, refreshed, error message or None)
+        """
+        try:
+            if pool.isActive():
+                pool.refresh(0)
+                return pool.name(), True, None
+            return pool.name(), False, None
+        except libvirt.libvirtError as e:
+            return pool.name(), False, str(e)
+
+    def refresh_pool(self, pool_name: str = None, label: str = "pools") -> Tuple[bool, str]:
         """
         Refresh storage pool to ensure up-to-date content information
 
+        Pools are refreshed concurrently; each refresh rescans the pool's
+        backing storage on the hypervisor.
+
         Args:
             pool_name: Optional name of specific pool to refresh
+            label: What the pools are called in the result message
 
         Returns:
             tuple: (success, message)
         """
+        self.invalidate_xml_cache(pool_name)
         try:
             if pool_name:
                 pools = [self.conn.storagePoolLookupByName(pool_name)]
             else:
-                pools = [self.conn.storagePoolLookupByName(name)
-                         for name in self.conn.listStoragePools()]
+                pools = self.conn.listAllStoragePools(libvirt.VIR_CONNECT_LIST_STORAGE_POOLS_ACTIVE)
 
             refreshed = []
             failed = []
 
-            for pool in pools:
-                try:
-                    if pool.isActive():
-                        pool.refresh(0)
-                        refreshed.append(pool.name())
-                except libvirt.libvirtError as e:
-                    failed.append((pool.name(), str(e)))
+            with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(pools)))) as executor:
+                for name, done, error in executor.map(self._refresh_one, pools):
+                    if error is not None:
+                        failed.append((name, error))
+                    elif done:
+                        refreshed.append(name)
 
             if failed:
                 failures = '; '.join([f"{name}: {error}" for name, error in failed])
-                return False, f"Failed to refresh pools: {failures}"
+                return False, f"Failed to refresh {label}: {failures}"
 
-            return True, f"Successfully refreshed pools: {', '.join(refreshed)}"
+            return True, f"Successfully refreshed {label}: {', '.join(refreshed)}"
 
         except libvirt.libvirtError as e:
             return False, str(e)
\ No newline at end of file
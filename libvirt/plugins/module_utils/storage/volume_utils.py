@@ -5,9 +5,15 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
-import fnmatch
-import xml.etree.ElementTree as ElementTree
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+from ansible_collections.nsys.libvirt.plugins.module_utils.common.glob_utils import compile_glob_union, is_glob
+from ansible_collections.nsys.libvirt.plugins.module_utils.storage.pool_utils import StoragePoolUtils
 
 try:
     import libvirt
@@ -48,19 +54,24 @@ class VolumeUtils:
         except libvirt.libvirtError:
             return False
 
-    def _get_pool(self, pool_name: str) -> Optional[libvirt.virStoragePool]:
+    def _get_pool(self, pool_name: str, refresh: bool = False) -> Optional[libvirt.virStoragePool]:
         """
-        Internal method to get and refresh a storage pool
+        Internal method to get and optionally refresh a storage pool
+
+        Refreshing rescans the pool's backing storage, so read paths leave
+        it to refresh_pool().
 
         Args:
             pool_name: Name of the storage pool
+            refresh: Whether to refresh the pool after looking it up
 
         Returns:
             Optional[virStoragePool]: Pool object or None if not found
         """
         try:
             pool = self.conn.storagePoolLookupByName(pool_name)
-            self._refresh_pool(pool)
+            if refresh:
+                self._refresh_pool(pool)
             return pool
         except libvirt.libvirtError:
             return None
@@ -77,13 +88,39 @@ class VolumeUtils:
         """
         try:
             root = ElementTree.fromstring(vol_xml)
-            format_elem = root.find(".//format")
+            format_elem = root.find("target/format")
             if format_elem is not None and "type" in format_elem.attrib:
                 return format_elem.attrib["type"]
         except ElementTree.ParseError:
             pass
         return "raw"
 
+    def build_volume_info(self, pool_name: str, vol: libvirt.virStorageVol,
+                          vol_info: Optional[List] = None) -> Dict:
+        """
+        Build the information dictionary for a storage volume object
+
+        Args:
+            pool_name: Name of the storage pool holding the volume
+            vol: libvirt storage volume object
+            vol_info: Result of vol.info() if the caller already has it
+
+        Returns:
+            dict: Volume information
+        """
+        if vol_info is None:
+            vol_info = vol.info()
+        vol_xml = vol.XMLDesc(0)
+
+        return {
+            "name": vol.name(),
+            "path": vol.path(),
+            "capacity": vol_info[1],
+            "allocation": vol_info[2],
+            "format": self._extract_volume_format(vol_xml),
+            "pool": pool_name,
+        }
+
     def get_volume_info(self, pool_name: str, volume_name: str) -> Dict:
         """
         Get detailed information about a specific volume
@@ -101,49 +138,62 @@ class VolumeUtils:
                 return {}
                 
             vol = pool.storageVolLookupByName(volume_name)
-            vol_info = vol.info()
-            vol_xml = vol.XMLDesc(0)
-
-            return {
-                "name": volume_name,
-                "path": vol.path(),
-                "capacity": vol_info[1],
-                "allocation": vol_info[2],
-                "format": self._extract_volume_format(vol_xml),
-                "pool": pool_name,
-            }
+            return self.build_volume_info(pool_name, vol)
         except libvirt.libvirtError:
             return {}
 
-    def get_volumes_by_pattern(self, pool_name: str, pattern: str) -> List[Dict]:
+    def iter_volumes_by_pattern(self, pool_name: str, pattern: str) -> Iterator[Dict]:
         """
-        Get information about volumes matching a pattern within a pool
+        Yield information about volumes matching a pattern within a pool
+
+        Volume details are queried lazily as the caller consumes the iterator.
 
         Args:
             pool_name: Name of the storage pool
             pattern: Glob pattern to match volume names
 
-        Returns:
-            list: List of volume information dictionaries
+        Yields:
+            dict: Volume information
         """
-        volumes = []
+        if not is_glob(pattern):
+            # A literal name matches at most one volume: skip listing the pool
+            vol_info = self.get_volume_info(pool_name, pattern)
+            if vol_info:
+                yield vol_info
+            return
+
         try:
             pool = self._get_pool(pool_name)
             if not pool:
-                return volumes
+                return
 
-            all_volumes = pool.listVolumes()
-            matching_volumes = fnmatch.filter(all_volumes, pattern)
+            # Volume objects come back directly, the pool is looked up once and not refreshed
+            matching_volumes = pool.listAllVolumes(0)
+            if pattern != "*":
+                regex = compile_glob_union(pattern)
+                matching_volumes = [vol for vol in matching_volumes if regex.match(vol.name())]
+        except libvirt.libvirtError:
+            return
 
-            for volume in matching_volumes:
-                vol_info = self.get_volume_info(pool_name, volume)
-                if vol_info:
-                    volumes.append(vol_info)
+        for vol in matching_volumes:
+            try:
+                yield self.build_volume_info(pool_name, vol)
+            except libvirt.libvirtError:
+                # Volume deleted between listing and querying
+                continue
 
-        except libvirt.libvirtError:
-            pass
+    def get_volumes_by_pattern(self, pool_name: str, pattern: str) -> List[Dict]:
+        """
+        Get information about volumes matching a pattern within a pool
 
-        return volumes
+        Args:
+            pool_name: Name of the storage pool
+            pattern: Glob pattern to match volume names
+
+        Returns:
+            list: List of volume information dictionaries
+        """
+        return list(self.iter_volumes_by_pattern(pool_name, pattern))
 
     def get_pool_volumes(self, pool_name: str) -> List[Dict]:
         """
@@ -168,7 +218,7 @@ class VolumeUtils:
             bool: True if refresh successful, False otherwise
         """
         try:
-            pool = self._get_pool(pool_name)
+            pool = self._get_pool(pool_name, refresh=True)
             return bool(pool)
         except libvirt.libvirtError:
             return False
@@ -184,7 +234,12 @@ class VolumeUtils:
         Returns:
             bool: True if volume exists, False otherwise
         """
-        return bool(self.get_volume_info(pool_name, volume_name))
+        try:
+            pool = self.conn.storagePoolLookupByName(pool_name)
+            pool.storageVolLookupByName(volume_name)
+            return True
+        except libvirt.libvirtError:
+            return False
 
     def parse_volume_path(self, volume_path: str) -> Tuple[str, str]:
         """
@@ -199,11 +254,10 @@ class VolumeUtils:
         Raises:
             ValueError: If path format is invalid
         """
-        try:
-            pool_name, volume_name = volume_path.split("/", 1)
-            return pool_name, volume_name
-        except ValueError:
+        pool_name, sep, volume_name = volume_path.partition("/")
+        if not sep:
             raise ValueError("Volume path must be in format 'pool_name/volume_name'")
+        return pool_name, volume_name
 
 
     def refresh_storage_pool(self, pool_name: str = None) -> tuple[bool, str]:
@@ -216,29 +270,4 @@ class VolumeUtils:
         Returns:
             tuple: (success, message)
         """
-        try:
-            if pool_name:
-                pools = [self.conn.storagePoolLookupByName(pool_name)]
-            else:
-                pools = [self.conn.storagePoolLookupByName(name)
-                         for name in self.conn.listStoragePools()]
-
-            refreshed = []
-            failed = []
-
-            for pool in pools:
-                try:
-                    if pool.isActive():
-                        pool.refresh(0)
-                        refreshed.append(pool.name())
-                except libvirt.libvirtError as e:
-                    failed.append((pool.name(), str(e)))
-
-            if failed:
-                failures = '; '.join([f"{name}: {error}" for name, error in failed])
-                return False, f"Failed to refresh storage pools: {failures}"
-
-            return True, f"Successfully refreshed storage pools: {', '.join(refreshed)}"
-
-        except libvirt.libvirtError as e:
-            return False, str(e)
\ No newline at end of file
+        return StoragePoolUtils(self.conn).refresh_pool(pool_name, label="storage pools")
\ No newline at end of file
@@ -120,9 +120,16 @@ msg:
 
 import os
 import uuid
-import random
 import traceback
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
+else:
+    HAS_LXML = True
 
 try:
     import libvirt
@@ -133,17 +140,49 @@ except ImportError:
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.libvirt_connection import LibvirtConnection
 from ansible_collections.nsys.libvirt.plugins.module_utils.storage.volume_utils import VolumeUtils
-from ansible_collections.nsys.libvirt.plugins.module_utils.domain.domain_utils import DomainUtils
+
+
+def _compile_path(path):
+    """Return a callable selecting path from an element, compiled once with lxml"""
+    if HAS_LXML:
+        return ET.XPath(path)
+    return lambda root: root.findall(path)
+
+
+# Sources of the disks that get cloned (CDROMs and floppies are left alone)
+DISK_SOURCES = _compile_path("devices/disk[@device='disk']/source")
+# MAC address elements of all interfaces
+INTERFACE_MACS = _compile_path("devices/interface/mac")
+
+# Upper bound for disks cloned concurrently
+MAX_WORKERS = 8
+
+def generate_mac_addresses(count):
+    """Generate random MAC addresses in KVM format, drawing all entropy in one call"""
+    rnd = os.urandom(3 * count)
+    return ["52:54:00:" + rnd[i:i + 3].hex(':') for i in range(0, 3 * count, 3)]
+
 
 def generate_mac_address():
     """Generate a random MAC address in KVM format"""
-    mac = [0x52, 0x54, 0x00,
-           random.randint(0x00, 0xff),
-           random.randint(0x00, 0xff),
-           random.randint(0x00, 0xff)]
-    return ':'.join(map(lambda x: "%02x" % x, mac))
+    return generate_mac_addresses(1)[0]
 
-def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_clone=False):
+def get_pool_path(pool, pool_paths):
+    """
+    Return the target path of a storage pool
+
+    Args:
+        pool: Storage pool object
+        pool_paths: Dict of pool name to target path, filled on first use of a pool
+    """
+    pool_path = pool_paths.get(pool.name())
+    if pool_path is None:
+        pool_xml = ET.fromstring(pool.XMLDesc(0))
+        pool_path = pool_paths[pool.name()] = pool_xml.find('target/path').text
+    return pool_path
+
+def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_clone=False,
+                 pool_paths=None, source_pool=None):
     """
     Clone a storage volume, optionally to a different pool
     
@@ -153,14 +192,19 @@ def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_cl
         target_name: Name for cloned volume
         target_pool: Target pool object (optional)
         linked_clone: Whether to create a COW clone
+        pool_paths: Optional dict of pool name to target path, filled and reused
+                    across calls so each pool's XML is fetched once
+        source_pool: Pool containing source_vol when already known by the caller;
+                     only looked up when no target pool is given
     """
     try:
-        source_pool = source_vol.storagePoolLookupByVolume()
+        if target_pool is None and source_pool is None:
+            source_pool = source_vol.storagePoolLookupByVolume()
         vol_xml = source_vol.XMLDesc(0)
         
         # Parse XML to get format
         root = ET.fromstring(vol_xml)
-        format_elem = root.find(".//format")
+        format_elem = root.find("target/format")
         vol_format = format_elem.get('type') if format_elem is not None else 'raw'
         
         # Modify XML for clone
@@ -170,11 +214,10 @@ def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_cl
             
         # Get target pool path
         pool_to_use = target_pool if target_pool else source_pool
-        pool_xml = ET.fromstring(pool_to_use.XMLDesc(0))
-        pool_path = pool_xml.find('.//path').text
+        pool_path = get_pool_path(pool_to_use, {} if pool_paths is None else pool_paths)
             
         # Update target path
-        target = root.find('.//target/path')
+        target = root.find('target/path')
         if target is not None:
             new_path = os.path.join(pool_path, target_name)
             target.text = new_path
@@ -182,19 +225,20 @@ def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_cl
         clone_xml = ET.tostring(root, encoding='unicode')
         
         # Create the clone
-        flags = libvirt.VIR_STORAGE_VOL_CREATE_PREALLOC_METADATA
         if linked_clone and vol_format == 'qcow2':
             # For linked clones, we need to create in the same pool as source
             if target_pool:
                 raise Exception("Linked clones must be in the same pool as the source volume")
             # Create COW clone
             backing_store = source_vol.path()
-            clone_vol = pool_to_use.createXML(clone_xml, flags)
+            # No metadata preallocation, the overlay is meant to grow lazily
+            clone_vol = pool_to_use.createXML(clone_xml, 0)
             # Set up backing chain
             clone_vol.backingStore(backing_store, vol_format, 0)
         else:
             # Full clone - can be in different pool
-            clone_vol = pool_to_use.createXMLFrom(clone_xml, source_vol, flags)
+            clone_vol = pool_to_use.createXMLFrom(clone_xml, source_vol,
+                                                  libvirt.VIR_STORAGE_VOL_CREATE_PREALLOC_METADATA)
             
         return {
             'name': target_name,
@@ -206,17 +250,45 @@ def clone_volume(vol_utils, source_vol, target_name, target_pool=None, linked_cl
     except libvirt.libvirtError as e:
         raise Exception(f"Failed to clone volume: {str(e)}")
 
-def clone_domain_xml(xml_str, clone_name, volume_map):
+def rollback_volumes(module, conn, cloned_volumes):
+    """
+    Delete cloned volumes after a failed clone, best effort and concurrently
+
+    Args:
+        module: AnsibleModule instance, used to report volumes left behind
+        conn: libvirt connection
+        cloned_volumes: Volume dicts as returned by clone_volume()
+    """
+    def delete(path):
+        conn.storageVolLookupByPath(path).delete(0)
+
+    if not cloned_volumes:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(cloned_volumes))) as executor:
+        futures = {executor.submit(delete, vol['path']): vol['path'] for vol in cloned_volumes}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except libvirt.libvirtError as e:
+                module.warn(f"Failed to remove cloned volume {futures[future]}: {str(e)}")
+
+def clone_domain_xml(root, clone_name, volume_map):
     """
     Prepare domain XML for clone, updating volume paths
     
     Args:
-        xml_str: Original domain XML
+        root: Parsed original domain XML, modified in place; str or UTF-8
+              encoded bytes are parsed first
         clone_name: Name for the cloned domain
         volume_map: Dict mapping original volume paths to cloned volume paths
     """
     try:
-        root = ET.fromstring(xml_str)
+        if isinstance(root, str):
+            root = root.encode('utf-8')
+        if isinstance(root, bytes):
+            # The parser reads bytes directly, no implicit re-encoding of the document
+            root = ET.fromstring(root)
         
         # Update name
         root.find('name').text = clone_name
@@ -225,17 +297,15 @@ def clone_domain_xml(xml_str, clone_name, volume_map):
         root.find('uuid').text = str(uuid.uuid4())
         
         # Generate new MAC addresses
-        for interface in root.findall('.//interface/mac'):
-            interface.set('address', generate_mac_address())
+        macs = INTERFACE_MACS(root)
+        for mac, address in zip(macs, generate_mac_addresses(len(macs))):
+            mac.set('address', address)
             
         # Update disk paths to point to cloned volumes
-        for disk in root.findall('.//disk'):
-            if disk.get('device') == 'disk':
-                source = disk.find('source')
-                if source is not None:
-                    orig_path = source.get('file')
-                    if orig_path in volume_map:
-                        source.set('file', volume_map[orig_path])
+        for source in DISK_SOURCES(root):
+            orig_path = source.get('file')
+            if orig_path in volume_map:
+                source.set('file', volume_map[orig_path])
             
         # Remove any runtime-specific elements
         for elem in root.findall(".//domain/*[@uuid]"):
@@ -282,7 +352,6 @@ def main():
 
         # Initialize utilities
         volume_utils = VolumeUtils(conn)
-        domain_utils = DomainUtils(conn)
 
         name = module.params['name']
         clone_name = module.params['clone_name']
@@ -296,17 +365,22 @@ def main():
         }
 
         try:
-            # Verify source domain exists
-            if not domain_utils.domain_exists(name):
+            # One listing answers both existence checks; name() is read client-side
+            domains = {domain.name(): domain for domain in conn.listAllDomains(0)}
+
+            # Verify source domain exists, keeping the handle for later use
+            source_domain = domains.get(name)
+            if source_domain is None:
                 module.fail_json(msg=f"Source domain {name} not found")
 
             # Check if clone already exists
-            if domain_utils.domain_exists(clone_name):
-                # Get info about existing clone for return value
-                clone_info = domain_utils.get_domain_info(clone_name)
+            existing_clone = domains.get(clone_name)
+
+            if existing_clone is not None:
+                # Only the UUID is reported for an existing clone
                 result['clone_info'] = {
                     'name': clone_name,
-                    'uuid': clone_info.get('uuid', ''),
+                    'uuid': existing_clone.UUIDString(),
                     'storage': []  # We don't track the original clone operation's storage info
                 }
                 result['msg'] = f"Domain clone '{clone_name}' already exists"
@@ -327,40 +401,68 @@ def main():
             if linked_clone and target_pool_name:
                 module.fail_json(msg="Linked clones must be in the same storage pool as the source volume")
 
-            source_domain = conn.lookupByName(name)
-            source_xml = source_domain.XMLDesc(0)
+            source_xml = source_domain.XMLDesc(0).encode('utf-8')
 
             if not module.check_mode:
                 # First pass: identify and clone all storage volumes
                 cloned_volumes = []
                 volume_map = {}  # Maps original paths to cloned paths
+                pool_paths = {}  # Target path per pool, shared by all disks
+                source_pools = {}  # Source pool per pool target directory
+                # Parsed once: the disk pass only reads the tree, clone_domain_xml() then edits it
                 root = ET.fromstring(source_xml)
 
-                for disk in root.findall('.//disk'):
-                    if disk.get('device') == 'disk':  # Only clone actual disks, not CDROMs
-                        source = disk.find('source')
-                        if source is not None:
-                            source_path = source.get('file')
-                            if source_path:
-                                try:
-                                    source_vol = conn.storageVolLookupByPath(source_path)
-                                    target_name = os.path.basename(source_path).replace(name, clone_name)
-                                    cloned_vol = clone_volume(volume_utils, source_vol, target_name,
-                                                              target_pool, linked_clone)
-                                    cloned_volumes.append(cloned_vol)
-                                    volume_map[source_path] = cloned_vol['path']
-                                except libvirt.libvirtError as e:
-                                    # Clean up any volumes we've already cloned
-                                    for vol in cloned_volumes:
-                                        try:
-                                            clone_vol = conn.storageVolLookupByPath(vol['path'])
-                                            clone_vol.delete(0)
-                                        except:
-                                            pass
-                                    raise Exception(f"Failed to clone volume: {str(e)}")
+                # Only actual disks are cloned, not CDROMs
+                source_paths = [path for path in (source.get('file') for source in DISK_SOURCES(root))
+                                if path]
+
+                def clone_disk(source_path):
+                    source_vol = conn.storageVolLookupByPath(source_path)
+                    target_name = os.path.basename(source_path).replace(name, clone_name)
+                    source_pool = None
+                    if target_pool is None:
+                        # Disks in the same pool directory share one pool lookup
+                        directory = os.path.dirname(source_path)
+                        source_pool = source_pools.get(directory)
+                        if source_pool is None:
+                            source_pool = source_vol.storagePoolLookupByVolume()
+                            if get_pool_path(source_pool, pool_paths).rstrip('/') == directory:
+                                source_pools[directory] = source_pool
+                    return clone_volume(volume_utils, source_vol, target_name,
+                                        target_pool, linked_clone, pool_paths, source_pool)
+
+                # The copies run inside libvirtd, so the disks are cloned concurrently
+                results = {}
+                failure = None
+                with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(source_paths)))) as executor:
+                    futures = {executor.submit(clone_disk, path): index
+                               for index, path in enumerate(source_paths)}
+                    for future in as_completed(futures):
+                        if future.cancelled():
+                            continue
+                        try:
+                            results[futures[future]] = future.result()
+                        except Exception as e:
+                            if failure is None:
+                                failure = e
+                                # Don't start copies that would only be rolled back
+                                for pending in futures:
+                                    pending.cancel()
+
+                for index, source_path in enumerate(source_paths):
+                    if index in results:
+                        cloned_volumes.append(results[index])
+                        volume_map[source_path] = results[index]['path']
+
+                if failure is not None:
+                    # Clean up any volumes we've already cloned
+                    rollback_volumes(module, conn, cloned_volumes)
+                    if isinstance(failure, libvirt.libvirtError):
+                        raise Exception(f"Failed to clone volume: {str(failure)}")
+                    raise failure
 
                 # Second pass: create domain XML with updated paths
-                clone_xml = clone_domain_xml(source_xml, clone_name, volume_map)
+                clone_xml = clone_domain_xml(root, clone_name, volume_map)
 
                 # Define the cloned domain
                 clone_domain = conn.defineXML(clone_xml)
@@ -112,11 +112,9 @@ msg:
     type: str
     returned: always
 '''
-import time
-import os
 import traceback
 import uuid
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
 
 try:
     import libvirt
@@ -124,78 +122,76 @@ try:
 except ImportError:
     HAS_LIBVIRT = False
 
+if HAS_LIBVIRT:
+    # Everything attached to the definition goes with it
+    UNDEFINE_FLAGS = (
+            libvirt.VIR_DOMAIN_UNDEFINE_MANAGED_SAVE |  # Remove managed save state
+            libvirt.VIR_DOMAIN_UNDEFINE_SNAPSHOTS_METADATA |  # Remove snapshot metadata
+            libvirt.VIR_DOMAIN_UNDEFINE_NVRAM |  # Remove NVRAM file
+            libvirt.VIR_DOMAIN_UNDEFINE_CHECKPOINTS_METADATA  # Remove checkpoint metadata
+    )
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.libvirt_connection import LibvirtConnection
-from ansible_collections.nsys.libvirt.plugins.module_utils.domain.domain_utils import DomainUtils
+from ansible_collections.nsys.libvirt.plugins.module_utils.domain.domain_utils import DomainUtils, start_event_loop
+
+
+# Only name, UUID, memory and vCPUs vary, everything else is fixed:
+# EFI secure boot on q35, SPICE graphics and a serial console
+DOMAIN_XML_TEMPLATE = """<domain type='kvm'>
+  <name>{name}</name>
+  <uuid>{uuid}</uuid>
+  <memory unit='MiB'>{memory}</memory>
+  <currentMemory unit='MiB'>{memory}</currentMemory>
+  <vcpu placement='static'>{vcpu}</vcpu>
+  <os>
+    <type arch='x86_64' machine='pc-q35-7.2'>hvm</type>
+    <loader readonly='yes' type='pflash' secure='yes'>/usr/share/edk2/x64/OVMF_CODE.secboot.4m.fd</loader>
+    <nvram>/var/lib/libvirt/qemu/nvram/{name}_VARS.fd</nvram>
+  </os>
+  <features>
+    <acpi/>
+    <apic/>
+    <smm state='on'/>
+  </features>
+  <clock offset='utc'>
+    <timer name='rtc' tickpolicy='catchup'/>
+    <timer name='pit' tickpolicy='delay'/>
+    <timer name='hpet' present='no'/>
+  </clock>
+  <devices>
+    <emulator>/usr/bin/qemu-system-x86_64</emulator>
+    <console type='pty'>
+      <target type='serial' port='0'/>
+    </console>
+    <graphics type='spice' autoport='yes'>
+      <listen type='address'/>
+      <image compression='off'/>
+      <gl enable='no'/>
+    </graphics>
+    <video>
+      <model type='cirrus' vram='16384' heads='1' primary='yes'/>
+      <address type='pci' domain='0x0000' bus='0x07' slot='0x01' function='0x0'/>
+    </video>
+  </devices>
+</domain>"""
 
 
 def generate_domain_xml(name, vcpu, memory_mb):
     """Generate domain XML configuration"""
-    domain = ET.Element('domain', type='kvm')
-
-    name_elem = ET.SubElement(domain, 'name')
-    name_elem.text = name
-
-    uuid_elem = ET.SubElement(domain, 'uuid')
-    uuid_elem.text = str(uuid.uuid4())
-
-    memory_elem = ET.SubElement(domain, 'memory', unit='MiB')
-    memory_elem.text = str(memory_mb)
-
-    currentMemory_elem = ET.SubElement(domain, 'currentMemory', unit='MiB')
-    currentMemory_elem.text = str(memory_mb)
-
-    vcpu_elem = ET.SubElement(domain, 'vcpu', placement='static')
-    vcpu_elem.text = str(vcpu)
-
-    # OS configuration with EFI
-    os = ET.SubElement(domain, 'os')
-    type_elem = ET.SubElement(os, 'type', arch='x86_64', machine='pc-q35-7.2')
-    type_elem.text = 'hvm'
-    ET.SubElement(os, 'loader', readonly='yes', type='pflash',
-                  secure='yes').text = '/usr/share/edk2/x64/OVMF_CODE.secboot.4m.fd'
-    ET.SubElement(os, 'nvram').text = '/var/lib/libvirt/qemu/nvram/' + name + '_VARS.fd'
-
-    # Basic features
-    features = ET.SubElement(domain, 'features')
-    ET.SubElement(features, 'acpi')
-    ET.SubElement(features, 'apic')
-    ET.SubElement(features, 'smm', state='on')  # Required for secure boot
-
-    # Clock configuration
-    clock = ET.SubElement(domain, 'clock', offset='utc')
-    ET.SubElement(clock, 'timer', name='rtc', tickpolicy='catchup')
-    ET.SubElement(clock, 'timer', name='pit', tickpolicy='delay')
-    ET.SubElement(clock, 'timer', name='hpet', present='no')
-
-    # Device configuration
-    devices = ET.SubElement(domain, 'devices')
-
-    # Basic device configuration
-    ET.SubElement(devices, 'emulator').text = '/usr/bin/qemu-system-x86_64'
-
-    # Console and serial devices
-    console = ET.SubElement(devices, 'console', type='pty')
-    ET.SubElement(console, 'target', type='serial', port='0')
-
-    # Graphics device
-    graphics = ET.SubElement(devices, 'graphics', type='spice', autoport='yes')
-    ET.SubElement(graphics, 'listen', type='address')
-    ET.SubElement(graphics, 'image', compression='off')
-    ET.SubElement(graphics, 'gl', enable='no')
-
-    # Video device
-    video = ET.SubElement(devices, 'video')
-    model = ET.SubElement(video, 'model', type='cirrus', vram='16384', heads='1', primary='yes')
-    address = ET.SubElement(video, 'address', type='pci', domain='0x0000', bus='0x07', slot='0x01', function='0x0')
-
-    return ET.tostring(domain, encoding='unicode')
+    return DOMAIN_XML_TEMPLATE.format(
+        name=escape(name),
+        uuid=uuid.uuid4(),
+        memory=int(memory_mb),
+        vcpu=int(vcpu)
+    )
 
 def create_domain(module, domain_utils, name, vcpu, memory):
     """Create a new domain"""
     try:
-        if domain_utils.domain_exists(name):
-            return False, "Domain already exists", domain_utils.get_domain_info(name)
+        domain = domain_utils.try_lookup(name)
+        if domain is not None:
+            return False, "Domain already exists", domain_utils.build_domain_info(domain)
             
         xml = generate_domain_xml(name, vcpu, memory)
         domain = domain_utils.conn.defineXML(xml)
@@ -203,7 +199,7 @@ def create_domain(module, domain_utils, name, vcpu, memory):
         if domain is None:
             module.fail_json(msg="Failed to define the domain")
             
-        return True, "Domain created successfully", domain_utils.get_domain_info(name)
+        return True, "Domain created successfully", domain_utils.build_domain_info(domain)
         
     except libvirt.libvirtError as e:
         module.fail_json(msg=f"Error creating domain: {str(e)}")
@@ -212,23 +208,17 @@ def create_domain(module, domain_utils, name, vcpu, memory):
 def remove_domain(module, domain_utils, name):
     """Remove an existing domain and all associated resources"""
     try:
-        if not domain_utils.domain_exists(name):
+        domain = domain_utils.try_lookup(name)
+        if domain is None:
             return False, "Domain does not exist", None
 
-        domain = domain_utils.conn.lookupByName(name)
-
         # Force shutdown if running
         if domain.isActive():
             try:
                 # Try graceful shutdown first
                 domain.shutdown()
-                # Wait for up to 30 seconds for shutdown
-                for _ in range(30):
-                    if not domain.isActive():
-                        break
-                    time.sleep(1)
-                # Force if still running
-                if domain.isActive():
+                # Wait for up to 30 seconds for shutdown, force if still running
+                if not domain_utils.wait_for_shutoff(domain, timeout=30):
                     domain.destroy()
             except libvirt.libvirtError:
                 # If shutdown fails, go straight to destroy
@@ -241,31 +231,11 @@ def remove_domain(module, domain_utils, name):
         except libvirt.libvirtError as e:
             module.warn(f"Failed to remove managed save: {str(e)}")
 
-        # Combine all undefine flags
-        undefine_flags = (
-                libvirt.VIR_DOMAIN_UNDEFINE_MANAGED_SAVE |  # Remove managed save state
-                libvirt.VIR_DOMAIN_UNDEFINE_SNAPSHOTS_METADATA |  # Remove snapshot metadata
-                libvirt.VIR_DOMAIN_UNDEFINE_NVRAM |  # Remove NVRAM file
-                libvirt.VIR_DOMAIN_UNDEFINE_CHECKPOINTS_METADATA  # Remove checkpoint metadata
-        )
-
-        try:
-            domain.undefineFlags(undefine_flags)
-        except libvirt.libvirtError:
-            # Fallback to basic undefine if flags not supported
-            module.warn("Advanced undefine flags not supported, falling back to basic undefine")
-            try:
-                domain.undefine()
-            except libvirt.libvirtError as e:
-                module.fail_json(msg=f"Failed to undefine domain: {str(e)}")
-
-        # Extra cleanup for NVRAM file
         try:
-            nvram_path = f"/var/lib/libvirt/qemu/nvram/{name}_VARS.fd"
-            if os.path.exists(nvram_path):
-                os.remove(nvram_path)
-        except (OSError, IOError) as e:
-            module.warn(f"Failed to remove NVRAM file: {str(e)}")
+            # libvirt deletes the NVRAM file itself
+            domain.undefineFlags(UNDEFINE_FLAGS)
+        except libvirt.libvirtError as e:
+            module.fail_json(msg=f"Failed to undefine domain: {str(e)}")
 
         return True, "Domain and all associated resources removed successfully", None
 
@@ -291,6 +261,10 @@ def main():
     if not HAS_LIBVIRT:
         module.fail_json(msg='The libvirt python module is required')
 
+    # Shutdown waits in remove_domain are woken by lifecycle events when this succeeds
+    if module.params['state'] == 'absent' and not module.check_mode:
+        start_event_loop()
+
     # Initialize connection handler
     libvirt_conn = LibvirtConnection(module)
     
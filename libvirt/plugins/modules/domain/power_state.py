@@ -87,6 +87,10 @@ def main():
     if not HAS_LIBVIRT:
         module.fail_json(msg='libvirt-python is required for this module')
 
+    # Check mode reports a change without inspecting the domain, no connection needed
+    if module.check_mode:
+        module.exit_json(changed=True)
+
     # Initialize connection handler
     libvirt_conn = LibvirtConnection(module)
     
@@ -99,9 +103,6 @@ def main():
         if not success:
             module.fail_json(msg=f"Failed to connect to libvirt: {conn}")
 
-        if module.check_mode:
-            module.exit_json(changed=True)
-
         domain_utils = DomainUtils(conn)
         
         if not domain_utils.domain_exists(module.params['name']):
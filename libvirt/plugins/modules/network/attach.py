@@ -112,7 +112,9 @@ RETURN = r"""
         type: str
         returned: always
     already_attached:
-        description: Whether the network was already attached to the domain
+        description:
+            - Whether the network was already attached to the domain
+            - An attached interface whose link state differs is updated in place
         type: bool
         returned: always
     domain_running:
@@ -126,7 +128,16 @@ RETURN = r"""
 """
 
 import re
-import xml.etree.ElementTree as ElementTree
+from copy import deepcopy
+
+try:
+    from lxml import etree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+    HAS_LXML = False
+else:
+    HAS_LXML = True
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.libvirt_connection import LibvirtConnection
 
@@ -137,6 +148,21 @@ try:
 except ImportError:
     HAS_LIBVIRT = False
 
+# Characters that appear entity-escaped in libvirt's XML output
+XML_ESCAPED_CHARS = frozenset("&<>'\"")
+
+if HAS_LXML:
+    # Network interfaces whose source is the network passed as $network
+    NETWORK_INTERFACE_XPATH = ElementTree.XPath(
+        "devices/interface[@type='network'][source/@network=$network]"
+    )
+
+# Interface definition used for attaching, copied and filled in per call
+INTERFACE_TEMPLATE = ElementTree.Element("interface", type="network")
+ElementTree.SubElement(INTERFACE_TEMPLATE, "source")
+ElementTree.SubElement(INTERFACE_TEMPLATE, "model", type="virtio")
+ElementTree.SubElement(INTERFACE_TEMPLATE, "link")
+
 
 class NetworkAttacher:
     """
@@ -190,55 +216,102 @@ class NetworkAttacher:
         except libvirt.libvirtError as e:
             self.module.fail_json(msg=f"Failed to get domain state: {str(e)}")
 
+    def find_network_interface(self, domain_xml):
+        """
+        Find the interface of the domain that is attached to the network
+
+        Args:
+            domain_xml: XML description of the domain
+
+        Returns:
+            Element: Interface element or None if the network is not attached
+        """
+        # A network that is never referenced needs no parse; names with characters
+        # XML escapes can't be searched for verbatim and always take the parse
+        if XML_ESCAPED_CHARS.isdisjoint(self.network_name) and \
+                f"network='{self.network_name}'" not in domain_xml and \
+                f'network="{self.network_name}"' not in domain_xml:
+            return None
+
+        root = ElementTree.fromstring(domain_xml)
+        if HAS_LXML:
+            matches = NETWORK_INTERFACE_XPATH(root, network=self.network_name)
+            return matches[0] if matches else None
+
+        for interface in root.findall("devices/interface[@type='network']"):
+            source = interface.find("source")
+            if source is not None and source.get('network') == self.network_name:
+                return interface
+        return None
+
     def is_network_attached(self, domain):
         """
         Check if network is already attached to domain
-        Returns tuple of (bool, str) where str is existing MAC if found
+        Returns tuple of (bool, bool, element) - whether an interface is present,
+        whether its link state matches the requested one, and the interface element
         """
         try:
-            domain_xml = domain.XMLDesc(0)
-            root = ElementTree.fromstring(domain_xml)
-
-            for interface in root.findall(".//interface[@type='network']"):
-                source = interface.find("source")
-                if source is not None and source.get('network') == self.network_name:
-                    mac = interface.find("mac")
-                    return True, mac.get('address') if mac is not None else None
-            return False, None
+            interface = self.find_network_interface(domain.XMLDesc(0))
+            if interface is None:
+                return False, False, None
+            # libvirt omits <link/> for interfaces whose link is up
+            link = interface.find("link")
+            state = link.get('state', 'up') if link is not None else 'up'
+            return True, state == ("up" if self.connected else "down"), interface
         except (libvirt.libvirtError, ElementTree.ParseError) as e:
             self.module.fail_json(msg=f"Failed to check network attachment: {str(e)}")
 
+    def update_link_state(self, domain, interface, is_running):
+        """
+        Flip the link state of an already attached interface in place
+
+        Args:
+            domain: libvirt domain object
+            interface: Interface element taken from the domain XML
+            is_running: Whether the live domain should be updated as well
+        """
+        link = interface.find("link")
+        if link is None:
+            link = ElementTree.SubElement(interface, "link")
+        link.set('state', "up" if self.connected else "down")
+
+        try:
+            flags = libvirt.VIR_DOMAIN_AFFECT_CONFIG
+            if is_running:
+                flags |= libvirt.VIR_DOMAIN_AFFECT_LIVE
+
+            domain.updateDeviceFlags(ElementTree.tostring(interface, encoding='unicode'), flags)
+
+        except libvirt.libvirtError as e:
+            self.module.fail_json(msg=f"Failed to update network link state: {str(e)}")
+
     def attach_network(self, domain, network, is_running):
         """
         Attach network to domain
         Returns MAC address of attached interface
         """
-        interface_xml = f"""
-        <interface type='network'>
-            <source network='{network.name()}'/>
-            <model type='virtio'/>
-            <link state='{"up" if self.connected else "down"}'/>
-            {f"<mac address='{self.mac_address}'/>" if self.mac_address else ""}
-        </interface>
-        """
+        # Attribute values are escaped on serialization, whatever the network is called
+        interface = deepcopy(INTERFACE_TEMPLATE)
+        interface.find("source").set('network', network.name())
+        interface.find("link").set('state', "up" if self.connected else "down")
+        if self.mac_address:
+            ElementTree.SubElement(interface, "mac", address=self.mac_address)
+        interface_xml = ElementTree.tostring(interface, encoding='unicode')
 
         try:
             flags = libvirt.VIR_DOMAIN_AFFECT_CONFIG
             if is_running:
                 flags |= libvirt.VIR_DOMAIN_AFFECT_LIVE
 
-            domain.attachDeviceFlags(interface_xml.strip(), flags)
+            domain.attachDeviceFlags(interface_xml, flags)
 
             # Re-read domain XML to get generated MAC if none was specified
             if not self.mac_address:
-                domain_xml = domain.XMLDesc(0)
-                root = ElementTree.fromstring(domain_xml)
-                for interface in root.findall(".//interface[@type='network']"):
-                    source = interface.find("source")
-                    if source is not None and source.get('network') == self.network_name:
-                        mac = interface.find("mac")
-                        if mac is not None:
-                            return mac.get('address')
+                interface = self.find_network_interface(domain.XMLDesc(0))
+                if interface is not None:
+                    mac = interface.find("mac")
+                    if mac is not None:
+                        return mac.get('address')
 
             return self.mac_address
 
@@ -260,8 +333,10 @@ class NetworkAttacher:
         network, domain = self.validate_requirements()
         result['domain_running'] = self.is_domain_running(domain)
 
-        is_attached, existing_mac = self.is_network_attached(domain)
+        is_attached, link_matches, interface = self.is_network_attached(domain)
         if is_attached:
+            mac = interface.find("mac")
+            existing_mac = mac.get('address') if mac is not None else None
             result['already_attached'] = True
             result['mac_address'] = existing_mac
             # If MAC address specified and different from existing, fail
@@ -269,6 +344,11 @@ class NetworkAttacher:
                 self.module.fail_json(
                     msg=f"Network already attached with different MAC address: {existing_mac}"
                 )
+            # Only the link state differs: update the NIC instead of adding another
+            if not link_matches:
+                if not self.module.check_mode:
+                    self.update_link_state(domain, interface, result['domain_running'])
+                result['changed'] = True
             return result
 
         if not self.module.check_mode:
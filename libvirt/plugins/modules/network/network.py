@@ -385,7 +385,7 @@ class NetworkManager:
 
         try:
             # Check if network exists
-            existing_net = self.network_utils.get_network_info(name)
+            existing_net = self.network_utils.get_network_info(name, fields=["name"])
             if existing_net:
                 network = self.conn.networkLookupByName(name)
 
@@ -424,6 +424,7 @@ class NetworkManager:
 
             # Get final network info
             if state != 'absent':
+                self.network_utils.invalidate_xml_cache(name)
                 self.network_info = self.network_utils.get_network_info(name)
 
             return changed, self.network_info, msg
@@ -183,7 +183,9 @@ msg:
     returned: always
 '''
 
+import errno
 import os
+import re
 import pwd
 import grp
 import traceback
@@ -202,16 +204,23 @@ from ansible_collections.nsys.libvirt.plugins.module_utils.storage.volume_utils
 from ansible_collections.nsys.libvirt.plugins.module_utils.storage.pool_utils import StoragePoolUtils
 from ansible_collections.nsys.libvirt.plugins.module_utils.common.permission_manager import PermissionManager
 
+# Byte multipliers for the size suffixes accepted by parse_size()
+SIZE_UNITS = {'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+SIZE_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)\s*([BKMGT]?)$', re.IGNORECASE)
+
+# Bytes read from the image and sent to the upload stream per call
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Holes in the image can be found with lseek() and skipped during upload
+HAS_SEEK_DATA = hasattr(os, 'SEEK_DATA') and hasattr(os, 'SEEK_HOLE')
+
 
 def parse_size(size_str):
     """Convert size string (like '5G', '1024M') to bytes"""
-    units = {'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
-    size = size_str.strip()
-    unit = size[-1].upper()
-    if unit in units:
-        return int(float(size[:-1]) * units[unit])
-    else:
-        return int(size)
+    match = SIZE_PATTERN.match(size_str.strip())
+    if match is None:
+        raise ValueError(f"Invalid size: {size_str}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper() or 'B'])
 
 
 def resolve_owner(owner):
@@ -302,20 +311,26 @@ def get_volume_xml(name, capacity, allocation, format):
     return volume_xml
 
 
-def create_volume(module, volume_utils, pool_utils, pool_name, vol_name, capacity, allocation, format,
+def lookup_volume(pool, vol_name):
+    """Return the named volume of an already resolved pool, or None if it can't be found"""
+    try:
+        return pool.storageVolLookupByName(vol_name)
+    except libvirt.libvirtError:
+        return None
+
+
+def create_volume(module, volume_utils, pool_utils, pool, vol_name, capacity, allocation, format,
                   mode, owner, group):
     """Create a new volume with permissions"""
-    if volume_utils.volume_exists(pool_name, vol_name):
+    if lookup_volume(pool, vol_name) is not None:
         return False, "Volume already exists", None
 
     try:
-        pool = volume_utils.conn.storagePoolLookupByName(pool_name)
-
         # Activate pool if needed using pool utilities
         try:
             changed, msg = pool_utils.manage_pool_state(pool, "active", True)
             if not changed and not pool.isActive():
-                module.fail_json(msg=f"Failed to activate storage pool '{pool_name}': {msg}")
+                module.fail_json(msg=f"Failed to activate storage pool '{pool.name()}': {msg}")
         except Exception as e:
             module.fail_json(msg=f"Error activating pool: {str(e)}")
 
@@ -328,21 +343,20 @@ def create_volume(module, volume_utils, pool_utils, pool_name, vol_name, capacit
             module, vol.path(), mode, owner, group
         )
 
-        vol_info = volume_utils.get_volume_info(pool_name, vol_name)
+        vol_info = volume_utils.build_volume_info(pool.name(), vol)
         return True, "Volume created successfully", vol_info
 
     except libvirt.libvirtError as e:
         module.fail_json(msg=f"Error creating volume: {str(e)}")
 
 
-def delete_volume(module, volume_utils, pool_name, vol_name):
+def delete_volume(module, volume_utils, pool, vol_name):
     """Delete a volume"""
     try:
-        if not volume_utils.volume_exists(pool_name, vol_name):
+        vol = lookup_volume(pool, vol_name)
+        if vol is None:
             return False, "Volume does not exist", None
 
-        pool = volume_utils.conn.storagePoolLookupByName(pool_name)
-        vol = pool.storageVolLookupByName(vol_name)
         vol.delete(0)
         return True, "Volume deleted successfully", None
 
@@ -350,25 +364,26 @@ def delete_volume(module, volume_utils, pool_name, vol_name):
         module.fail_json(msg=f"Error deleting volume: {str(e)}")
 
 
-def resize_volume(module, volume_utils, pool_name, vol_name, new_capacity):
+def resize_volume(module, volume_utils, pool, vol_name, new_capacity):
     """Resize a volume"""
     try:
-        if not volume_utils.volume_exists(pool_name, vol_name):
+        vol = lookup_volume(pool, vol_name)
+        if vol is None:
             module.fail_json(msg=f"Volume {vol_name} does not exist")
 
-        pool = volume_utils.conn.storagePoolLookupByName(pool_name)
-        vol = pool.storageVolLookupByName(vol_name)
-        current_capacity = vol.info()[1]
+        # Reused for the unchanged result, so the no-op path queries the volume once
+        info = vol.info()
+        current_capacity = info[1]
         new_capacity_bytes = parse_size(new_capacity)
 
         if new_capacity_bytes == current_capacity:
             return False, "Volume is already at the specified size", \
-                volume_utils.get_volume_info(pool_name, vol_name)
+                volume_utils.build_volume_info(pool.name(), vol, info)
         elif new_capacity_bytes < current_capacity:
             module.fail_json(msg="New capacity must be larger than current capacity")
 
         vol.resize(new_capacity_bytes)
-        vol_info = volume_utils.get_volume_info(pool_name, vol_name)
+        vol_info = volume_utils.build_volume_info(pool.name(), vol)
         return True, f"Volume resized from {current_capacity} to {new_capacity_bytes} bytes", \
             vol_info
 
@@ -376,18 +391,108 @@ def resize_volume(module, volume_utils, pool_name, vol_name, new_capacity):
         module.fail_json(msg=f"Error resizing volume: {str(e)}")
 
 
-def import_volume(module, volume_utils, pool_name, vol_name, import_path, import_format,
+def send_image(stream, fd):
+    """
+    Send an image file through an upload stream
+
+    Args:
+        stream: libvirt stream the volume upload was started on
+        fd: File descriptor of the image, positioned at its start
+    """
+    while True:
+        data = os.read(fd, UPLOAD_CHUNK_SIZE)
+        if not data:
+            break
+        stream.send(data)
+
+
+def send_image_sparse(stream, fd, image_size):
+    """
+    Send an image file through a sparse upload stream, transmitting holes as
+    lengths only so they are neither read nor written as zeros
+
+    Args:
+        stream: libvirt stream the volume upload was started with
+                VIR_STORAGE_VOL_UPLOAD_SPARSE_STREAM
+        fd: File descriptor of the image
+        image_size: Size of the image in bytes
+    """
+    offset = 0
+    while offset < image_size:
+        try:
+            data_start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            # ENXIO: nothing but a trailing hole is left
+            if e.errno != errno.ENXIO:
+                raise
+            data_start = image_size
+
+        if data_start > offset:
+            stream.sendHole(data_start - offset, 0)
+            offset = data_start
+            continue
+
+        data_end = min(os.lseek(fd, offset, os.SEEK_HOLE), image_size)
+        os.lseek(fd, offset, os.SEEK_SET)
+        while offset < data_end:
+            data = os.read(fd, min(UPLOAD_CHUNK_SIZE, data_end - offset))
+            if not data:
+                raise IOError(f"Image shrank during upload at offset {offset}")
+            stream.send(data)
+            offset += len(data)
+
+
+def upload_image(conn, vol, import_path, image_size):
+    """
+    Upload a local image into a volume, skipping holes where possible
+
+    Args:
+        conn: libvirt connection
+        vol: Target volume object
+        import_path: Path of the image file
+        image_size: Size of the image in bytes
+    """
+    fd = os.open(import_path, os.O_RDONLY)
+    try:
+        stream = conn.newStream(0)
+        sparse = HAS_SEEK_DATA
+        if sparse:
+            try:
+                vol.upload(stream, 0, image_size, libvirt.VIR_STORAGE_VOL_UPLOAD_SPARSE_STREAM)
+            except libvirt.libvirtError:
+                # Pool backends without sparse stream support reject the flag
+                stream = conn.newStream(0)
+                sparse = False
+        if not sparse:
+            vol.upload(stream, 0, image_size, 0)
+
+        try:
+            if sparse:
+                send_image_sparse(stream, fd, image_size)
+            else:
+                send_image(stream, fd)
+        except BaseException:
+            try:
+                stream.abort()
+            except libvirt.libvirtError:
+                pass
+            raise
+        stream.finish()
+    finally:
+        os.close(fd)
+
+
+def import_volume(module, volume_utils, pool, vol_name, import_path, import_format,
                   mode, owner, group):
     """Import an existing image as a volume with permissions"""
     try:
-        if volume_utils.volume_exists(pool_name, vol_name):
+        if lookup_volume(pool, vol_name) is not None:
             return False, "Volume already exists", None
 
         if not os.path.exists(import_path):
             module.fail_json(msg=f"Import file {import_path} does not exist")
 
         image_size = os.path.getsize(import_path)
-        pool = volume_utils.conn.storagePoolLookupByName(pool_name)
 
         # Create new volume
         xml = get_volume_xml(vol_name, str(image_size), str(image_size), import_format)
@@ -396,24 +501,14 @@ def import_volume(module, volume_utils, pool_name, vol_name, import_path, import
             module.fail_json(msg="Failed to create the storage volume for import")
 
         # Upload content
-        stream = volume_utils.conn.newStream(0)
-        vol.upload(stream, 0, image_size, 0)
-
-        with open(import_path, 'rb') as f:
-            while True:
-                data = f.read(1024 * 1024)  # Read 1MB at a time
-                if not data:
-                    break
-                stream.send(data)
-
-        stream.finish()
+        upload_image(volume_utils.conn, vol, import_path, image_size)
 
         # Set permissions after import
         perm_changed = manage_volume_permissions(
             module, vol.path(), mode, owner, group
         )
 
-        vol_info = volume_utils.get_volume_info(pool_name, vol_name)
+        vol_info = volume_utils.build_volume_info(pool.name(), vol)
         return True, f"Volume imported successfully (format: {import_format})", vol_info
 
     except (libvirt.libvirtError, IOError) as e:
@@ -487,11 +582,21 @@ def main():
 
         result = {'changed': False}
 
+        # Resolved once and handed to whichever operation runs below
+        try:
+            pool_obj = conn.storagePoolLookupByName(pool)
+        except libvirt.libvirtError as e:
+            if e.get_error_code() != libvirt.VIR_ERR_NO_STORAGE_POOL:
+                module.fail_json(msg=f"Failed to look up storage pool {pool}: {str(e)}")
+            if state == 'absent':
+                module.exit_json(changed=False, msg="Volume does not exist")
+            module.fail_json(msg=f"Storage pool {pool} not found")
+
         try:
             if state == 'present':
                 if import_image:
                     changed, message, vol_info = import_volume(
-                        module, volume_utils, pool, name,
+                        module, volume_utils, pool_obj, name,
                         import_image, import_format,
                         mode, uid, gid
                     )
@@ -501,28 +606,28 @@ def main():
                     if not allocation:
                         allocation = '0'  # Default to thin provisioning
                     changed, message, vol_info = create_volume(
-                        module, volume_utils, pool_utils, pool, name,
+                        module, volume_utils, pool_utils, pool_obj, name,
                         capacity, allocation, format,
                         mode, uid, gid
                     )
 
             elif state == 'absent':
                 changed, message, vol_info = delete_volume(
-                    module, volume_utils, pool, name
+                    module, volume_utils, pool_obj, name
                 )
 
             elif state == 'resize':
                 if not capacity:
                     module.fail_json(msg="'capacity' is required when state is 'resize'")
                 changed, message, vol_info = resize_volume(
-                    module, volume_utils, pool, name, capacity
+                    module, volume_utils, pool_obj, name, capacity
                 )
 
             elif state == 'import':
                 if not import_image:
                     module.fail_json(msg="'import_image' is required when state is 'import'")
                 changed, message, vol_info = import_volume(
-                    module, volume_utils, pool, name,
+                    module, volume_utils, pool_obj, name,
                     import_image, import_format,
                     mode, uid, gid
                 )